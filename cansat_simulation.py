@@ -1,8 +1,13 @@
 import serial
 from datetime import datetime, timedelta
-import time
 import random
 import math
+from sim_clock import SimClock, make_clock
+from session_capture import CaptureTransport
+from tx_queue import QueuedTransport
+from trajectory import FlightTrack
+from sim_mode import SimPressureFeed, PressureProfile, ProfilePlayer, valid_pressure
+from latency_trace import PacketTracer
 
 # Load constants for 2026 mission
 def load_constants(year):
@@ -42,17 +47,24 @@ class CanSatSimulator:
     BASE_LON = 112.79431652372989
     MAX_DISTANCE_KM = 2.0  # Larger radius for realistic flight path
 
-    def __init__(self, year, comport, baudrate, transmit_delim="\r\n", receive_delim="\r\n"):
+    def __init__(self, year, comport, baudrate, transmit_delim="\r\n", receive_delim="\r\n",
+                 clock=None, packet_interval=1.0, transport=None, tracer=None):
         self.constants = load_constants(year)
-        self.serial_port = serial.Serial(comport, baudrate, timeout=1)
+        self.clock = clock if clock is not None else SimClock()
+        self.packet_interval = packet_interval
+        # Any pyserial-like object (write/readline/in_waiting/close) can stand in for the port
+        self.serial_port = transport if transport is not None else serial.Serial(comport, baudrate, timeout=1)
         self.transmit_delim = transmit_delim
         self.receive_delim = receive_delim
         self.telemetry_on = False
-        self.simulation_mode = False
+        self.sim_feed = SimPressureFeed()  # SIM ENABLE/ACTIVATE + SIMP pressures
+        self.profile_player = None
         self.packet_count = self.constants["PACKET_COUNT_START"]
         self.state = "LAUNCH_PAD"
-        self.last_transmission_time = datetime.now()
+        self.last_transmission_time = self.clock.now()
         self.cmd_echo = "CXON"  # Default command echo
+        self.track = None  # Precomputed GPS track, built on FLY
+        self.tracer = tracer  # Optional latency_trace.PacketTracer (trailing field after CHECKSUM)
         print(f"✅ CanSat 2026 Simulator initialized on {comport} at {baudrate} baud.")
 
     def send_command(self, command):
@@ -60,13 +72,17 @@ class CanSatSimulator:
         self.serial_port.write((command + self.transmit_delim).encode())
         print(f"Sent: {command}")
 
-    def receive_data(self):
-        """Receive data from the GCS."""
-        if self.serial_port.in_waiting > 0:
+    def receive_data(self, max_lines=1000):
+        """Receive data from the GCS, draining back-to-back commands (bounded)."""
+        handled = 0
+        while handled < max_lines and self.serial_port.in_waiting > 0:
             data = self.serial_port.readline().decode().strip()
-            if data:
+            if not data:
+                return
+            if ",SIMP," not in data:
                 print(f"Received: {data}")
-                self.process_command(data)
+            self.process_command(data)
+            handled += 1
 
     def process_command(self, data):
         """Process incoming commands and handle specific actions."""
@@ -79,6 +95,11 @@ class CanSatSimulator:
         cmd_main = parts[2].strip().upper()
         cmd_tail = parts[3].strip().upper() if len(parts) >= 4 else ""
         
+        # SIMP is the high-rate path: ingest and return (echo only if accepted)
+        if cmd_main == "SIMP":
+            self.handle_simp(cmd_tail)
+            return
+
         # Set command echo (no commas in echo)
         if cmd_main == "CX" and cmd_tail:
             self.cmd_echo = f"{cmd_main}{cmd_tail}"
@@ -119,6 +140,9 @@ class CanSatSimulator:
         
         self.flight_mode = True
         self.packet_count = 0
+        # Pad for 5 s, wind drift until apogee ends (40 s), then guided glide home
+        self.track = FlightTrack(self.BASE_LAT, self.BASE_LON, duration=100.0 * self.packet_interval,
+                                 launch_at=5.0 * self.packet_interval, guided_from=40.0 * self.packet_interval)
         print("🚀 Flight command received. Beginning flight sequence!")
 
     def handle_st(self, time_value):
@@ -128,14 +152,35 @@ class CanSatSimulator:
     def handle_sim(self, mode):
         """Handle simulation mode commands."""
         if mode == "ENABLE":    
-            self.simulation_mode = True
+            self.sim_feed.enable()
             print("Simulation mode enabled.")
         elif mode == "ACTIVATE":
-            print("Simulation mode activated.")
+            if self.sim_feed.activate():
+                self.telemetry_on = True
+                print("Simulation mode activated.")
+            else:
+                print("⚠️ SIM ACTIVATE ignored: send SIM ENABLE first.")
         elif mode == "DISABLE":
-            self.simulation_mode = False
+            self.sim_feed.disable()
             print("Simulation mode disabled.")
 
+    def handle_simp(self, value):
+        """Ingest a simulated pressure reading (Pa); ignored unless simulation mode is active."""
+        try:
+            pressure = float(value)
+        except ValueError:
+            pressure = None
+        if pressure is None or not valid_pressure(pressure):
+            print(f"Invalid SIMP pressure: {value}")
+            return
+        if self.sim_feed.ingest(pressure):
+            self.cmd_echo = f"SIMP{value}"
+
+    def load_pressure_profile(self, path, rate_hz=1.0):
+        """Feed simulation mode from a pressure-profile file instead of SIMP commands."""
+        self.profile_player = ProfilePlayer(PressureProfile(path), self.sim_feed, self.clock, rate_hz)
+        print(f"📈 Pressure profile loaded: {path} ({rate_hz:g} Hz)")
+
     def handle_cal(self):
         """Calibrate altitude to zero."""
         self.packet_count = 0
@@ -168,6 +213,12 @@ class CanSatSimulator:
 
     def random_coordinates(self):
         """Generate realistic flight path coordinates."""
+        if self.flight_mode and self.track is not None:
+            # Continuous precomputed track, held in place after landing
+            t = min(self.packet_count, 80) * self.packet_interval
+            lat, lon = self.track.position(t)
+            return round(lat, 4), round(lon, 4)
+
         if self.flight_mode:
             # Simulate drift during flight
             drift_factor = min(self.packet_count / 100.0, 1.0)  # Increase drift over time
@@ -185,6 +236,8 @@ class CanSatSimulator:
 
     def get_flight_altitude(self):
         """Generate realistic flight altitude profile reaching ~700m apogee."""
+        if self.sim_feed.active:
+            return round(self.sim_feed.altitude, 1)
         if not self.flight_mode:
             return round(random.uniform(0.0, 0.5), 1)
         
@@ -219,6 +272,9 @@ class CanSatSimulator:
 
     def update_flight_state(self):
         """Update flight state based on packet count and altitude."""
+        if self.sim_feed.active:
+            self.state = self.sim_feed.state
+            return
         if not self.flight_mode:
             self.state = "LAUNCH_PAD"
             return
@@ -240,16 +296,21 @@ class CanSatSimulator:
             self.state = "LANDED"
 
     def transmit_telemetry(self):
-        """Transmit 2026 format telemetry data every 1 second."""
-        current_time = datetime.now()
-        if (current_time - self.last_transmission_time).total_seconds() < 1:
+        """Transmit 2026 format telemetry data every packet interval (1 second by default)."""
+        now = self.clock.now()
+        # A degrading TX queue stretches the interval while the consumer lags
+        interval = self.packet_interval * getattr(self.serial_port, "rate_factor", 1.0)
+        if now - self.last_transmission_time < interval:
             return
+        current_time = self.clock.datetime()
+        if self.profile_player is not None:
+            self.profile_player.poll()
 
         # Update state
         self.update_flight_state()
         
         # Stop flight if landed
-        if self.flight_mode and self.state == "LANDED" and self.packet_count > 80:
+        if self.flight_mode and not self.sim_feed.active and self.state == "LANDED" and self.packet_count > 80:
             self.flight_mode = False
             self.telemetry_on = False
             print("🪂 Flight ended. Telemetry stopped.")
@@ -265,7 +326,11 @@ class CanSatSimulator:
         # Flight data with proper resolutions
         altitude = self.get_flight_altitude()
         temperature = round(random.uniform(*self.constants['temperature_range']), 1)
-        pressure = round(random.uniform(*self.constants['pressure_range']), 1)
+        sim_pressure = self.sim_feed.pressure_kpa() if self.sim_feed.active else None
+        if sim_pressure is not None:
+            pressure = round(sim_pressure, 1)
+        else:
+            pressure = round(random.uniform(*self.constants['pressure_range']), 1)
         voltage = round(random.uniform(*self.constants['voltage_range']), 1)
         current = round(random.uniform(*self.constants['current_range']), 2)
 
@@ -290,7 +355,7 @@ class CanSatSimulator:
         gps_sats = random.randint(*self.constants['gps_sats_range'])
 
         # Mode
-        mode = "F" if self.flight_mode else "S"
+        mode = "F" if self.flight_mode and not self.sim_feed.active else "S"
 
         # Build packet in exact 2026 format
         packet = (
@@ -318,6 +383,8 @@ class CanSatSimulator:
 
         # Final packet
         full_packet = packet + f"{checksum}"
+        if self.tracer is not None:
+            full_packet = self.tracer.stamp(full_packet)
 
         # Transmit
         try:
@@ -327,19 +394,26 @@ class CanSatSimulator:
             print(f"Error transmitting: {e}")
 
         self.packet_count += 1
-        self.last_transmission_time = current_time
+        self.last_transmission_time = now
 
-    def start(self):
+    def start(self, until_landed=False):
         """Main loop for receiving data and transmitting telemetry."""
         try:
             while True:
                 self.receive_data()
                 if self.telemetry_on:
+                    was_flying = self.flight_mode
                     self.transmit_telemetry()
-                time.sleep(0.05)  # Short delay
+                    if until_landed and was_flying and not self.flight_mode:
+                        break
+                self.clock.sleep(0.05)  # Short delay
         except KeyboardInterrupt:
             print("🛑 Simulation terminated by user.")
         finally:
+            if self.profile_player is not None:
+                self.profile_player.profile.close()
+            if self.tracer is not None:
+                self.tracer.close()
             self.serial_port.close()
 
 # Main execution
@@ -349,6 +423,25 @@ if __name__ == "__main__":
     baudrate = 19200
     transmit_delim = "\r\n"
     receive_delim = "\r\n"
-
-    cansat = CanSatSimulator(year, comport, baudrate, transmit_delim, receive_delim)
+    speed = "realtime"  # "realtime", "10x", "100x" or "fast"
+    capture_path = None  # e.g. "session.cap" or "session.cap.gz" to record TX/RX frames
+    tx_policy = None  # "block", "drop_oldest", "drop_newest" or "degrade" to queue TX writes
+    sim_profile = None  # e.g. "pressure_profile.txt" to fly simulation mode from a file
+    trace_mode = None  # "field" (trailing seq@ns field) or "sidecar" to trace per-packet latency
+    trace_sidecar = "trace_sidecar.csv"
+
+    transport = None
+    if capture_path:
+        transport = CaptureTransport(serial.Serial(comport, baudrate, timeout=1), capture_path,
+                                     compress=capture_path.endswith(".gz"))
+    if tx_policy:
+        inner = transport if transport is not None else serial.Serial(comport, baudrate, timeout=1)
+        transport = QueuedTransport(inner, maxsize=256, policy=tx_policy)
+    tracer = PacketTracer(trace_mode, trace_sidecar) if trace_mode else None
+    cansat = CanSatSimulator(year, comport, baudrate, transmit_delim, receive_delim, clock=make_clock(speed),
+                             transport=transport, tracer=tracer)
+    if sim_profile:
+        cansat.load_pressure_profile(sim_profile)
+        cansat.handle_sim("ENABLE")
+        cansat.handle_sim("ACTIVATE")
     cansat.start()
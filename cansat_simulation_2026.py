@@ -5,10 +5,19 @@ Sends telemetry in CSV format matching the expected header
 """
 
 import serial
-import time
 import random
 import math
-from datetime import datetime
+import threading
+from flight_dynamics import FlightDynamics
+from sim_clock import SimClock, make_clock, format_elapsed
+from session_capture import CaptureTransport
+from shm_transport import ShmRingTransport
+from network_bridge import TelemetryBridge
+from sensor_producers import SensorSuite
+from tx_queue import QueuedTransport
+from trajectory import FlightTrack
+from sim_mode import SimPressureFeed, PressureProfile, ProfilePlayer, valid_pressure
+from latency_trace import PacketTracer
 
 class CanSatSimulator:
     """CanSat simulator that sends CSV telemetry data"""
@@ -34,29 +43,64 @@ class CanSatSimulator:
         "_PG_LANDED"
     ]
     
-    def __init__(self, port, baudrate=115200):
-        """Initialize the simulator"""
-        self.port = serial.Serial(port, baudrate, timeout=1)
-        print(f"✅ Connected to {port} at {baudrate} baud")
+    def __init__(self, port, baudrate=115200, physics=False, clock=None, packet_interval=1.0,
+                 transport=None, tracer=None):
+        """Initialize the simulator (transport overrides the serial port if given)"""
+        if transport is not None:
+            self.port = transport
+            print(f"✅ Using {type(transport).__name__} transport")
+        else:
+            self.port = serial.Serial(port, baudrate, timeout=1)
+            print(f"✅ Connected to {port} at {baudrate} baud")
+        
+        # Per-packet console logging (disable for high-rate runs)
+        self.verbose = True
+        
+        # Optional latency tracing (latency_trace.PacketTracer); None keeps packets unchanged
+        self.tracer = tracer
         
         # Flight parameters
         self.team_id = "1064"
         self.packet_count = 0
         self.flight_mode = True
         self.telemetry_enabled = False
-        self.simulation_enabled = False
+        
+        # Simulation mode: altitude and state come from SIMP pressures
+        self.sim_feed = SimPressureFeed()
+        self.profile_player = None
         
         # Base coordinates (Surabaya area)
         self.base_lat = -7.275764
         self.base_lon = 112.794317
         self.max_drift_km = 2.0
         
+        # Simulation clock (real time by default) and telemetry period
+        self.clock = clock if clock is not None else SimClock()
+        self.packet_interval = packet_interval
+        
         # Mission time
         self.mission_start = None
         
+        # Precomputed GPS track (built on FLY) and paraglider target
+        self.track = None
+        self.track_time = 0.0
+        self.target = None
+        
         # Command echo
         self.cmd_echo = "CXON"
         
+        # Optional physics-based flight model (replaces the scripted curves)
+        self.flight_model = FlightDynamics() if physics else None
+        self.last_step_time = None
+        self.dynamics_sample = None
+        self.last_altitude = 0.0
+        
+        # Optional multi-rate sensor producer threads (see start_sensor_producers).
+        # Channels and command handling share this lock, so a FLY reset never
+        # interleaves with an IMU step and channel state has one writer at a time.
+        self.sensors = None
+        self.state_lock = threading.RLock()
+        
         # Send header on startup
         self.send_header()
         
@@ -76,17 +120,20 @@ class CanSatSimulator:
         if self.mission_start is None:
             return "00:00:00"
         
-        elapsed = int((datetime.now() - self.mission_start).total_seconds())
-        hours = elapsed // 3600
-        minutes = (elapsed % 3600) // 60
-        seconds = elapsed % 60
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        return format_elapsed(self.clock.now() - self.mission_start)
     
     def get_flight_state(self):
         """Determine current flight state based on packet count"""
+        if self.sim_feed.active:
+            return self.sim_feed.state
+        
         if not self.flight_mode:
             return "LAUNCH_PAD"
         
+        if self.flight_model is not None:
+            with self.state_lock:
+                return self.flight_model.state_name()
+        
         t = self.packet_count
         if t <= 5:
             return "LAUNCH_PAD"
@@ -105,9 +152,18 @@ class CanSatSimulator:
     
     def get_pg_state(self):
         """Get paraglider state"""
+        if self.sim_feed.active:
+            return self.pg_state_for(self.sim_feed.state, self.sim_feed.altitude, self.sim_feed.probe_release_alt)
+        
         if not self.flight_mode:
             return "_PG_CRUISE"
         
+        if self.flight_model is not None:
+            with self.state_lock:
+                state = self.flight_model.state_name()
+                altitude = float(self.flight_model.altitude[0])
+            return self.pg_state_for(state, altitude, self.flight_model.probe_release_alt)
+        
         t = self.packet_count
         if t <= 40:
             return "_PG_CRUISE"
@@ -122,6 +178,20 @@ class CanSatSimulator:
         else:
             return "_PG_LANDED"
     
+    @staticmethod
+    def pg_state_for(state, altitude, probe_release_alt):
+        """Paraglider state that matches a flight state (physics and simulation mode)"""
+        if state == "LANDED":
+            return "_PG_LANDED"
+        if state == "PAYLOAD_RELEASE":
+            return "_PG_FLARE"
+        if state == "PROBE_RELEASE":
+            return "_PG_FINAL"
+        if state == "DESCENT":
+            # Approach under canopy, then loiter over the last stretch before probe release
+            return "_PG_LOITER" if altitude <= 1.5 * probe_release_alt else "_PG_APPROACH"
+        return "_PG_CRUISE"
+    
     def get_altitude(self):
         """Generate realistic altitude profile"""
         if not self.flight_mode:
@@ -151,6 +221,16 @@ class CanSatSimulator:
     
     def get_gps_coordinates(self):
         """Generate GPS coordinates with drift during flight"""
+        if self.flight_mode and self.track is not None:
+            # Follow the precomputed track; hold position once landed
+            if self.get_flight_state() != "LANDED":
+                if self.flight_model is not None:
+                    self.track_time = self.clock.now() - self.mission_start
+                else:
+                    self.track_time = self.packet_count * self.packet_interval
+            lat, lon = self.track.position(self.track_time)
+            return round(lat, 6), round(lon, 6)
+        
         if self.flight_mode:
             drift_factor = min(self.packet_count / 100.0, 1.0)
             radius = (self.max_drift_km * drift_factor) / 111.0
@@ -182,82 +262,174 @@ class CanSatSimulator:
         
         return round(roll, 1), round(pitch, 1), round(yaw, 1)
     
+    def step_flight_model(self):
+        """Advance the physics model by the time elapsed since the last packet"""
+        now = self.clock.now()
+        if self.last_step_time is not None:
+            self.flight_model.step(now - self.last_step_time)
+        self.last_step_time = now
+        return self.flight_model.sample()
+    
+    def start_track(self):
+        """Precompute the GPS track for a new flight"""
+        if self.flight_model is not None:
+            self.track = FlightTrack(self.base_lat, self.base_lon, duration=240.0, target=self.target,
+                                     launch_at=0.0, guided_from=40.0)
+        else:
+            # Scripted phases follow packet count: pad for 5 packets, glide after
+            # apogee (packet 40), so scale the track by the packet interval
+            scale = self.packet_interval
+            self.track = FlightTrack(self.base_lat, self.base_lon, duration=240.0 * scale, dt=0.1 * scale,
+                                     target=self.target, launch_at=5.0 * scale, guided_from=40.0 * scale)
+        self.track_time = 0.0
+    
+    def start_flight_model(self):
+        """Reset the physics model and launch the vehicle"""
+        if self.flight_model is not None:
+            self.flight_model.reset()
+            self.flight_model.launch()
+            self.last_step_time = None
+    
+    # === SENSOR CHANNELS ===
+    # Each channel returns a dict of telemetry fields. generate_telemetry()
+    # samples them in turn, or reads their latest values from the
+    # multi-rate producer threads when sensor producers are enabled.
+    
+    def sample_imu(self):
+        """IMU channel: gyro, accel and orientation (steps the physics model)"""
+        if self.flight_model is not None:
+            sample = self.step_flight_model()
+            self.dynamics_sample = sample
+            return {key: sample[key] for key in (
+                "GYRO_R", "GYRO_P", "GYRO_Y", "ACCEL_R", "ACCEL_P", "ACCEL_Y", "ROLL", "PITCH", "YAW")}
+        
+        if self.flight_mode and self.get_flight_state() in ["ASCENT", "APOGEE", "DESCENT"]:
+            gyro = [round(random.uniform(-50.0, 50.0), 1) for _ in range(3)]
+            accel = [round(random.uniform(-10.0, 10.0), 1) for _ in range(3)]
+        else:
+            gyro = [round(random.uniform(-2.0, 2.0), 1) for _ in range(3)]
+            accel = [round(random.uniform(-0.5, 0.5), 1),
+                     round(random.uniform(-0.5, 0.5), 1),
+                     round(random.uniform(9.5, 10.5), 1)]
+        roll, pitch, yaw = self.get_orientation()
+        return {
+            "GYRO_R": gyro[0], "GYRO_P": gyro[1], "GYRO_Y": gyro[2],
+            "ACCEL_R": accel[0], "ACCEL_P": accel[1], "ACCEL_Y": accel[2],
+            "ROLL": roll, "PITCH": pitch, "YAW": yaw,
+        }
+    
+    def sample_environment(self):
+        """Environmental channel: state, altitude, temperature, pressure and power"""
+        if self.sim_feed.active:
+            state = self.sim_feed.state
+            altitude = round(self.sim_feed.altitude, 1)
+            temperature = round(random.uniform(5.0, 35.0), 1)
+            pressure = self.sim_feed.pressure_kpa()
+            pressure = round(pressure, 1) if pressure is not None else round(random.uniform(85.0, 103.0), 1)
+        elif self.flight_model is not None:
+            sample = self.dynamics_sample or self.flight_model.sample()
+            state = sample["STATE"] if self.flight_mode else "LAUNCH_PAD"
+            altitude = sample["ALTITUDE"]
+            temperature = sample["TEMPERATURE"]
+            pressure = sample["PRESSURE"]
+        else:
+            state = self.get_flight_state()
+            altitude = self.get_altitude()
+            temperature = round(random.uniform(5.0, 35.0), 1)
+            pressure = round(random.uniform(85.0, 103.0), 1)
+        self.last_altitude = altitude
+        return {
+            "STATE": state,
+            "ALTITUDE": altitude,
+            "TEMPERATURE": temperature,
+            "PRESSURE": pressure,
+            "VOLTAGE": round(random.uniform(3.5, 4.2), 1),
+            "CURRENT": round(random.uniform(0.10, 0.50), 2),
+        }
+    
+    def sample_gps(self):
+        """GPS channel: position, GPS altitude and satellite count"""
+        gps_lat, gps_lon = self.get_gps_coordinates()
+        return {
+            "GPS_ALTITUDE": round(self.last_altitude + random.uniform(-10.0, 10.0), 1),
+            "GPS_LATITUDE": gps_lat,
+            "GPS_LONGITUDE": gps_lon,
+            "GPS_SATS": random.randint(4, 12),
+        }
+    
+    def sample_paraglider(self):
+        """Paraglider channel: guidance state and ground detection"""
+        if self.flight_mode and self.track is not None:
+            heading_error, distance_to_target = self.track.guidance(self.track_time)
+        else:
+            heading_error = random.uniform(-15.0, 15.0)
+            distance_to_target = random.uniform(0.0, 1000.0)
+        return {
+            "HEADING_ERROR": round(heading_error, 1),
+            "PG_STATE": self.get_pg_state(),
+            "DISTANCE_TO_TARGET": round(distance_to_target, 1),
+            "GROUND_DETECTION_ALTITUDE": round(self.last_altitude + random.uniform(-5.0, 5.0), 1),
+        }
+    
+    def start_sensor_producers(self, rates=None):
+        """Run each sensor channel on its own thread at its own rate"""
+        self.sensors = SensorSuite({
+            "imu": self.sample_imu,
+            "environment": self.sample_environment,
+            "gps": self.sample_gps,
+            "paraglider": self.sample_paraglider,
+        }, self.clock, rates, lock=self.state_lock)
+        self.sensors.start()
+        print("🧵 Sensor producers running: " + ", ".join(
+            f"{p.channel} {1.0 / p.period:g} Hz" for p in self.sensors.producers))
+    
     def generate_telemetry(self):
         """Generate complete telemetry packet"""
         mission_time = self.get_mission_time()
-        mode = "F" if self.flight_mode else "S"
-        state = self.get_flight_state()
-        
-        # Sensor data
-        altitude = self.get_altitude()
-        temperature = round(random.uniform(5.0, 35.0), 1)
-        pressure = round(random.uniform(85.0, 103.0), 1)
-        voltage = round(random.uniform(3.5, 4.2), 1)
-        current = round(random.uniform(0.10, 0.50), 2)
-        
-        # IMU data
-        if self.flight_mode and state in ["ASCENT", "APOGEE", "DESCENT"]:
-            gyro_r = round(random.uniform(-50.0, 50.0), 1)
-            gyro_p = round(random.uniform(-50.0, 50.0), 1)
-            gyro_y = round(random.uniform(-50.0, 50.0), 1)
-            accel_r = round(random.uniform(-10.0, 10.0), 1)
-            accel_p = round(random.uniform(-10.0, 10.0), 1)
-            accel_y = round(random.uniform(-10.0, 10.0), 1)
-        else:
-            gyro_r = round(random.uniform(-2.0, 2.0), 1)
-            gyro_p = round(random.uniform(-2.0, 2.0), 1)
-            gyro_y = round(random.uniform(-2.0, 2.0), 1)
-            accel_r = round(random.uniform(-0.5, 0.5), 1)
-            accel_p = round(random.uniform(-0.5, 0.5), 1)
-            accel_y = round(random.uniform(9.5, 10.5), 1)
-        
-        # GPS data
-        gps_time = mission_time
-        gps_altitude = round(altitude + random.uniform(-10.0, 10.0), 1)
-        gps_lat, gps_lon = self.get_gps_coordinates()
-        gps_sats = random.randint(4, 12)
+        if self.profile_player is not None:
+            with self.state_lock:
+                self.profile_player.poll()
+        mode = "F" if self.flight_mode and not self.sim_feed.active else "S"
         
-        # Orientation
-        roll, pitch, yaw = self.get_orientation()
-        heading_error = round(random.uniform(-15.0, 15.0), 1)
-        
-        # Paraglider state
-        pg_state = self.get_pg_state()
-        distance_to_target = round(random.uniform(0.0, 1000.0), 1)
-        ground_detection_alt = round(altitude + random.uniform(-5.0, 5.0), 1)
+        if self.sensors is not None:
+            f = self.sensors.snapshot()
+        else:
+            f = {}
+            for channel in (self.sample_imu, self.sample_environment, self.sample_gps, self.sample_paraglider):
+                f.update(channel())
         
         # Build CSV line
         csv_line = (
-            f"{self.team_id},"           # TEAM_ID
-            f"{mission_time},"            # MISSION_TIME
-            f"{self.packet_count},"       # PACKET_COUNT
-            f"{mode},"                    # MODE
-            f"{state},"                   # STATE
-            f"{altitude},"                # ALTITUDE
-            f"{temperature},"             # TEMPERATURE
-            f"{pressure},"                # PRESSURE
-            f"{voltage},"                 # VOLTAGE
-            f"{current},"                 # CURRENT
-            f"{gyro_r},"                  # GYRO_R
-            f"{gyro_p},"                  # GYRO_P
-            f"{gyro_y},"                  # GYRO_Y
-            f"{accel_r},"                 # ACCEL_R
-            f"{accel_p},"                 # ACCEL_P
-            f"{accel_y},"                 # ACCEL_Y
-            f"{gps_time},"                # GPS_TIME
-            f"{gps_altitude},"            # GPS_ALTITUDE
-            f"{gps_lat},"                 # GPS_LATITUDE
-            f"{gps_lon},"                 # GPS_LONGITUDE
-            f"{gps_sats},"                # GPS_SATS
-            f"{self.cmd_echo},"           # CMD_ECHO
-            f","                          # Empty field (double comma)
-            f"{roll},"                    # ROLL
-            f"{pitch},"                   # PITCH
-            f"{yaw},"                     # YAW
-            f"{heading_error},"           # HEADING_ERROR
-            f"{pg_state},"                # PG_STATE
-            f"{distance_to_target},"      # DISTANCE_TO_TARGET
-            f"{ground_detection_alt}"     # GROUND_DETECTION_ALTITUDE
+            f"{self.team_id},"                    # TEAM_ID
+            f"{mission_time},"                     # MISSION_TIME
+            f"{self.packet_count},"                # PACKET_COUNT
+            f"{mode},"                             # MODE
+            f"{f['STATE']},"                       # STATE
+            f"{f['ALTITUDE']},"                    # ALTITUDE
+            f"{f['TEMPERATURE']},"                 # TEMPERATURE
+            f"{f['PRESSURE']},"                    # PRESSURE
+            f"{f['VOLTAGE']},"                     # VOLTAGE
+            f"{f['CURRENT']},"                     # CURRENT
+            f"{f['GYRO_R']},"                      # GYRO_R
+            f"{f['GYRO_P']},"                      # GYRO_P
+            f"{f['GYRO_Y']},"                      # GYRO_Y
+            f"{f['ACCEL_R']},"                     # ACCEL_R
+            f"{f['ACCEL_P']},"                     # ACCEL_P
+            f"{f['ACCEL_Y']},"                     # ACCEL_Y
+            f"{mission_time},"                     # GPS_TIME
+            f"{f['GPS_ALTITUDE']},"                # GPS_ALTITUDE
+            f"{f['GPS_LATITUDE']},"                # GPS_LATITUDE
+            f"{f['GPS_LONGITUDE']},"               # GPS_LONGITUDE
+            f"{f['GPS_SATS']},"                    # GPS_SATS
+            f"{self.cmd_echo},"                    # CMD_ECHO
+            f","                                   # Empty field (double comma)
+            f"{f['ROLL']},"                        # ROLL
+            f"{f['PITCH']},"                       # PITCH
+            f"{f['YAW']},"                         # YAW
+            f"{f['HEADING_ERROR']},"               # HEADING_ERROR
+            f"{f['PG_STATE']},"                    # PG_STATE
+            f"{f['DISTANCE_TO_TARGET']},"          # DISTANCE_TO_TARGET
+            f"{f['GROUND_DETECTION_ALTITUDE']}"    # GROUND_DETECTION_ALTITUDE
         )
         
         return csv_line
@@ -265,18 +437,42 @@ class CanSatSimulator:
     def send_telemetry(self):
         """Generate and send telemetry packet"""
         csv_line = self.generate_telemetry()
+        if self.tracer is not None:
+            csv_line = self.tracer.stamp(csv_line)
         self.port.write((csv_line + "\r\n").encode('utf-8'))
         
         # Log to console
-        print(f"📤 Packet {self.packet_count}: {csv_line[:80]}...")
+        if self.verbose:
+            print(f"📤 Packet {self.packet_count}: {csv_line[:80]}...")
         
         self.packet_count += 1
     
     def process_command(self, cmd_line):
         """Process incoming commands from ground station"""
-        print(f"📥 Received: {cmd_line}")
-        
+        with self.state_lock:
+            self._handle_command(cmd_line)
+    
+    def _handle_command(self, cmd_line):
+        """Command handling proper (called with state_lock held)"""
         parts = cmd_line.strip().split(',')
+        command = parts[2].upper() if len(parts) >= 3 else ""
+        
+        # SIMP arrives back-to-back at high rate: handle it before any logging
+        if command == "SIMP" and parts[0] == "CMD" and len(parts) >= 4:
+            try:
+                pressure = float(parts[3])
+            except ValueError:
+                pressure = None
+            if pressure is None or not valid_pressure(pressure):
+                print(f"❌ Invalid SIMP pressure: {parts[3]}")
+                return
+            if self.sim_feed.ingest(pressure):
+                self.cmd_echo = f"SIMP{parts[3].strip()}"
+            return
+        
+        if self.verbose:
+            print(f"📥 Received: {cmd_line}")
+        
         if len(parts) < 3:
             return
         
@@ -284,7 +480,6 @@ class CanSatSimulator:
             return
         
         # team_id = parts[1]
-        command = parts[2].upper()
         
         if command == "CX":
             # Toggle telemetry
@@ -292,7 +487,7 @@ class CanSatSimulator:
                 mode = parts[3].upper()
                 if mode == "ON":
                     self.telemetry_enabled = True
-                    self.mission_start = datetime.now()
+                    self.mission_start = self.clock.now()
                     self.packet_count = 0
                     self.cmd_echo = "CXON"
                     print("📡 Telemetry ON")
@@ -305,8 +500,10 @@ class CanSatSimulator:
         elif command == "FLY":
             self.flight_mode = True
             self.telemetry_enabled = True
-            self.mission_start = datetime.now()
+            self.mission_start = self.clock.now()
             self.packet_count = 0
+            self.start_flight_model()
+            self.start_track()
             self.cmd_echo = "FLY"
             print("🚀 Flight mode activated!")
         
@@ -319,37 +516,64 @@ class CanSatSimulator:
             if len(parts) >= 4:
                 sim_mode = parts[3].upper()
                 if sim_mode == "ENABLE":
-                    self.simulation_enabled = True
+                    self.sim_feed.enable()
                     self.cmd_echo = "SIMENABLE"
                     print("🎮 Simulation mode enabled")
+                elif sim_mode == "ACTIVATE":
+                    if self.sim_feed.activate():
+                        self.telemetry_enabled = True
+                        if self.mission_start is None:
+                            self.mission_start = self.clock.now()
+                        self.cmd_echo = "SIMACTIVATE"
+                        print("🎮 Simulation mode active - altitude from SIMP pressures")
+                    else:
+                        print("⚠️ SIM ACTIVATE ignored: send SIM ENABLE first")
                 elif sim_mode == "DISABLE":
-                    self.simulation_enabled = False
+                    self.sim_feed.disable()
                     self.cmd_echo = "SIMDISABLE"
                     print("🎮 Simulation mode disabled")
         
         elif command == "SET_TARGET":
             if len(parts) >= 5:
-                target_lat = parts[3]
-                target_lon = parts[4]
+                try:
+                    target_lat = float(parts[3])
+                    target_lon = float(parts[4])
+                except ValueError:
+                    print(f"❌ Invalid target: {parts[3]}, {parts[4]}")
+                    return
+                self.target = (target_lat, target_lon)
+                if self.track is not None:
+                    # Re-plan the glide from the current point of the flight
+                    self.track.retarget(target_lat, target_lon, self.track_time)
                 self.cmd_echo = "SETTARGET"
                 print(f"🎯 Target set: {target_lat}, {target_lon}")
         
         else:
             self.cmd_echo = command
-            print(f"❓ Unknown command: {command}")
+            if self.verbose:
+                print(f"❓ Unknown command: {command}")
     
-    def check_commands(self):
-        """Check for incoming commands"""
-        if self.port.in_waiting > 0:
+    def check_commands(self, max_lines=1000):
+        """Drain pending commands (bounded), so a SIMP burst never backs up"""
+        handled = 0
+        while handled < max_lines and self.port.in_waiting > 0:
             try:
                 line = self.port.readline().decode('utf-8').strip()
-                if line:
-                    self.process_command(line)
             except Exception as e:
                 print(f"❌ Error reading command: {e}")
+                return
+            if not line:
+                return
+            self.process_command(line)
+            handled += 1
     
-    def run(self):
-        """Main loop"""
+    def load_pressure_profile(self, path, rate_hz=1.0):
+        """Feed simulation mode from a pressure-profile file instead of SIMP commands"""
+        self.profile_player = ProfilePlayer(PressureProfile(path), self.sim_feed, self.clock, rate_hz)
+        print(f"📈 Pressure profile loaded: {path} ({rate_hz:g} Hz)")
+    
+    def run(self, until_landed=False):
+        """Main loop (returns after the first completed flight if until_landed)"""
         print("\n🛰️  CanSat Simulator Running")
         print("📋 Waiting for commands...")
         print("   Send 'CMD,1000,CX,ON' to start telemetry")
@@ -366,17 +590,28 @@ class CanSatSimulator:
                     self.send_telemetry()
                     
                     # Auto-stop after landing
-                    if self.flight_mode and self.get_flight_state() == "LANDED" and self.packet_count > 80:
+                    if self.flight_mode and not self.sim_feed.active and self.get_flight_state() == "LANDED" and (
+                            self.flight_model is not None or self.packet_count > 80):
                         print("🪂 Flight complete - telemetry stopped")
                         self.telemetry_enabled = False
                         self.flight_mode = False
+                        if until_landed:
+                            break
                 
-                # Wait ~1 second for next packet (20 Hz would be 0.05s)
-                time.sleep(1.0)
+                # Wait one packet interval of simulated time (1 Hz by default),
+                # stretched by a degrading TX queue while the consumer lags
+                self.clock.sleep(self.packet_interval * getattr(self.port, "rate_factor", 1.0))
                 
         except KeyboardInterrupt:
             print("\n\n⏹️  Simulation stopped by user")
         finally:
+            if self.sensors is not None:
+                self.sensors.stop()
+                print(f"🧵 Sensor producers: {self.sensors.stats()}")
+            if self.profile_player is not None:
+                self.profile_player.profile.close()
+            if self.tracer is not None:
+                self.tracer.close()
             self.port.close()
             print("👋 Port closed")
 
@@ -388,11 +623,45 @@ if __name__ == "__main__":
     PORT = "COM1"  # Change this to match your port
     BAUDRATE = 115200
     
+    PHYSICS = "--physics" in sys.argv
+    PRODUCERS = "--producers" in sys.argv
+    QUIET = "--quiet" in sys.argv
+    SPEED = "realtime"
+    CAPTURE = None
+    SHM = None
+    TX_POLICY = None
+    TCP_PORT = None
+    UDP_TARGETS = []
+    RATE = 1.0
+    SIM_PROFILE = None
+    TRACE = "--trace" in sys.argv
+    TRACE_SIDECAR = None
+    for arg in sys.argv[1:]:
+        if arg.startswith("--speed="):
+            SPEED = arg.split("=", 1)[1]
+        elif arg.startswith("--capture="):
+            CAPTURE = arg.split("=", 1)[1]
+        elif arg.startswith("--shm="):
+            SHM = arg.split("=", 1)[1]
+        elif arg.startswith("--tx-queue="):
+            TX_POLICY = arg.split("=", 1)[1]
+        elif arg.startswith("--tcp="):
+            TCP_PORT = int(arg.split("=", 1)[1])
+        elif arg.startswith("--udp="):
+            UDP_TARGETS.append(arg.split("=", 1)[1])
+        elif arg.startswith("--rate="):
+            RATE = float(arg.split("=", 1)[1])
+        elif arg.startswith("--sim-profile="):
+            SIM_PROFILE = arg.split("=", 1)[1]
+        elif arg.startswith("--trace-sidecar="):
+            TRACE_SIDECAR = arg.split("=", 1)[1]
+    
     # Parse command line arguments
-    if len(sys.argv) > 1:
-        PORT = sys.argv[1]
-    if len(sys.argv) > 2:
-        BAUDRATE = int(sys.argv[2])
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) > 0:
+        PORT = args[0]
+    if len(args) > 1:
+        BAUDRATE = int(args[1])
     
     print("=" * 60)
     print("  CanSat Telemetry Simulator")
@@ -400,11 +669,44 @@ if __name__ == "__main__":
     print("=" * 60)
     print(f"\n📡 Port: {PORT}")
     print(f"⚡ Baudrate: {BAUDRATE}")
-    print("\nUsage: python cansat_simulator_new.py [PORT] [BAUDRATE]")
+    print("\nUsage: python cansat_simulator_new.py [PORT] [BAUDRATE] [--physics] [--producers] [--quiet] [--speed=realtime|10x|fast] [--capture=FILE] [--shm=NAME] [--tcp=PORT] [--udp=HOST:PORT] [--rate=HZ] [--tx-queue=block|drop_oldest|drop_newest|degrade] [--sim-profile=FILE] [--trace] [--trace-sidecar=FILE]")
     print("Example: python cansat_simulator_new.py COM3 115200\n")
     
     try:
-        simulator = CanSatSimulator(PORT, BAUDRATE)
+        if SHM and (TCP_PORT is not None or UDP_TARGETS):
+            raise SystemExit("❌ --shm cannot be combined with --tcp/--udp; run the network bridge separately")
+        transport = None
+        if SHM:
+            # In-host ring: no uplink, so start the flight straight away
+            transport = ShmRingTransport(SHM)
+            transport.queue_command("CMD,1064,FLY")
+        elif TCP_PORT is not None or UDP_TARGETS:
+            # Network fan-out; also mirror to the serial port if one was given
+            mirror = serial.Serial(PORT, BAUDRATE, timeout=1) if args else None
+            transport = TelemetryBridge(TCP_PORT, UDP_TARGETS, port=mirror)
+        if CAPTURE:
+            inner = transport if transport is not None else serial.Serial(PORT, BAUDRATE, timeout=1)
+            transport = CaptureTransport(inner, CAPTURE, compress=CAPTURE.endswith(".gz"))
+        if TX_POLICY:
+            inner = transport if transport is not None else serial.Serial(PORT, BAUDRATE, timeout=1)
+            transport = QueuedTransport(inner, maxsize=256, policy=TX_POLICY)
+        tracer = None
+        if TRACE_SIDECAR:
+            tracer = PacketTracer("sidecar", TRACE_SIDECAR)
+        elif TRACE:
+            tracer = PacketTracer("field")
+        simulator = CanSatSimulator(PORT, BAUDRATE, physics=PHYSICS, clock=make_clock(SPEED),
+                                    packet_interval=1.0 / RATE, transport=transport, tracer=tracer)
+        if QUIET:
+            # Per-packet printing dominates at high --rate; keep only status messages
+            simulator.verbose = False
+        if PRODUCERS:
+            simulator.start_sensor_producers()
+        if SIM_PROFILE:
+            # Same as SIM ENABLE + SIM ACTIVATE, with pressures read from the file
+            simulator.load_pressure_profile(SIM_PROFILE)
+            simulator.process_command(f"CMD,{simulator.team_id},SIM,ENABLE")
+            simulator.process_command(f"CMD,{simulator.team_id},SIM,ACTIVATE")
         simulator.run()
     except serial.SerialException as e:
         print(f"\n❌ Serial port error: {e}")
@@ -0,0 +1,105 @@
+"""
+Telemetry checksum helpers with incremental patching.
+
+The 2025/2026 CHECKSUM is an additive byte sum (buatcs) over the first
+CHECKSUM_LIMIT characters of "<fields>,", folded into one byte via cs1/cs2.
+Because the sum is additive, changing a field only needs the old bytes
+subtracted and the new bytes added. PacketTemplate keeps a pre-encoded
+packet with known field offsets so counters and timestamps can be rewritten
+in O(changed bytes) instead of re-summing the whole packet.
+"""
+
+CHECKSUM_LIMIT = 150  # matches buatcs() in telemetry_generator.py
+
+
+def buatcs(data, limit=CHECKSUM_LIMIT):
+    """Byte sum of the first `limit` characters, stopping at NUL."""
+    if isinstance(data, str):
+        data = data.encode("latin-1")
+    data = data[:limit]
+    nul = data.find(b"\0")
+    if nul >= 0:
+        data = data[:nul + 1]
+    return sum(data) & 0xFFFF
+
+
+def fold_checksum(total):
+    """Fold a 16-bit byte sum into the one-byte CHECKSUM field."""
+    cs1 = total & 0xFF
+    cs2 = (total >> 8) & 0xFF
+    return ~(cs1 + cs2) & 0xFF
+
+
+def checksum_delta(old, new):
+    """Change in the byte sum when `old` bytes are replaced by `new`."""
+    return sum(new) - sum(old)
+
+
+class PacketTemplate:
+    """Pre-encoded checksummed region with named, patchable fields.
+
+    `chunks` are the constant byte runs around the fields, so the packet is
+    chunks[0] + value[0] + chunks[1] + ... + chunks[-1]. While the packet fits
+    inside the checksum limit the running sum is patched incrementally; a
+    packet longer than the limit whose field widths change falls back to
+    summing the limited prefix, since bytes then shift across the boundary.
+    """
+
+    def __init__(self, chunks, names, values, limit=CHECKSUM_LIMIT):
+        if len(chunks) != len(names) + 1 or len(names) != len(values):
+            raise ValueError("need one more chunk than fields")
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.limit = limit
+        self.data = bytearray(chunks[0])
+        self.offsets = []
+        self.widths = []
+        for value, chunk in zip(values, chunks[1:]):
+            self.offsets.append(len(self.data))
+            self.widths.append(len(value))
+            self.data += value
+            self.data += chunk
+        self._sum = sum(self.data)
+        self._limited = self._prefix_sum()
+
+    def _prefix_sum(self):
+        return buatcs(bytes(self.data), self.limit) if len(self.data) > self.limit else None
+
+    def set(self, name, value):
+        """Replace field `name` with `value` bytes, patching the running sum."""
+        i = self.index[name]
+        start, width = self.offsets[i], self.widths[i]
+        old = self.data[start:start + width]
+        if old == value:
+            return
+        delta = checksum_delta(old, value)
+        self._sum += delta
+        if len(value) == width:
+            self.data[start:start + width] = value
+            if self._limited is not None:
+                # Same width: only the bytes below the limit count
+                end = min(start + width, self.limit)
+                if start < end:
+                    self._limited += sum(value[:end - start]) - sum(old[:end - start])
+            return
+        # Width changed: splice and shift every later field's offset
+        self.data[start:start + width] = value
+        shift = len(value) - width
+        self.widths[i] = len(value)
+        for j in range(i + 1, len(self.offsets)):
+            self.offsets[j] += shift
+        self._limited = self._prefix_sum()
+
+    def checksum_sum(self):
+        """buatcs() of the current packet."""
+        if self._limited is not None:
+            return self._limited & 0xFFFF
+        return self._sum & 0xFFFF
+
+    def checksum(self):
+        """Folded one-byte CHECKSUM of the current packet."""
+        return fold_checksum(self.checksum_sum())
+
+    def encode(self):
+        """Current packet bytes followed by the CHECKSUM field."""
+        return bytes(self.data) + str(self.checksum()).encode()
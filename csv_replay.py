@@ -0,0 +1,120 @@
+"""
+Fast loop-mode replay of telemetry_data_*.csv files.
+
+The CSV is parsed once into a table of pre-encoded packets. Each pass
+loops over that table from memory and only rewrites PACKET_COUNT,
+MISSION_TIME / GPS_TIME and patches CHECKSUM incrementally, so counters keep increasing from one
+pass to the next and long soak tests never pay parse costs again.
+"""
+
+import csv
+import sys
+from datetime import datetime, timedelta
+
+from checksum import PacketTemplate
+from sim_clock import make_clock
+
+TIME_FORMAT = "%H:%M:%S"
+
+
+class ReplayTable:
+    """Telemetry rows as PacketTemplates with the rewritten fields at known offsets."""
+
+    VARIABLE_FIELDS = ("MISSION_TIME", "PACKET_COUNT", "GPS_TIME")
+
+    def __init__(self, path):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = [row for row in reader if row]
+        if not rows:
+            raise ValueError(f"{path}: no telemetry records")
+
+        self.header = header
+        self.has_checksum = header[-1] == "CHECKSUM"
+        self.variable = [i for i, name in enumerate(header) if name in self.VARIABLE_FIELDS]
+        self.count_col = header.index("PACKET_COUNT")
+        self.time_col = header.index("MISSION_TIME")
+
+        # Original counters/times; a pass shifts them by a constant offset
+        self.counts = [int(row[self.count_col]) for row in rows]
+        self.times = [datetime.strptime(row[self.time_col], TIME_FORMAT) for row in rows]
+        step = self.times[1] - self.times[0] if len(rows) > 1 else timedelta(seconds=1)
+        self.pass_count_offset = self.counts[-1] - self.counts[0] + 1
+        self.pass_time_offset = self.times[-1] - self.times[0] + step
+
+        # Pre-encode: constant chunks between variable fields, checksum excluded
+        data_end = len(header) - 1 if self.has_checksum else len(header)
+        names = [header[col] for col in self.variable]
+        self.templates = []
+        for row in rows:
+            fields = ["\0" if i in self.variable else value for i, value in enumerate(row[:data_end])]
+            chunks = [chunk.encode() for chunk in (",".join(fields) + ",").split("\0")]
+            values = [row[col].encode() for col in self.variable]
+            self.templates.append(PacketTemplate(chunks, names, values))
+
+    def __len__(self):
+        return len(self.templates)
+
+    def packet(self, index, pass_number):
+        """Encoded packet `index` of pass `pass_number` (without delimiter)."""
+        count = str(self.counts[index] + pass_number * self.pass_count_offset).encode()
+        stamp = (self.times[index] + pass_number * self.pass_time_offset).strftime(TIME_FORMAT).encode()
+        template = self.templates[index]
+        for col, name in zip(self.variable, template.names):
+            template.set(name, count if col == self.count_col else stamp)
+        if not self.has_checksum:
+            return bytes(template.data[:-1])
+        return template.encode()
+
+
+def replay(table, port, interval=1.0, loop_mode=False, passes=None, delimiter=b"\n", clock=None, verbose=True):
+    """Send the table to `port` every `interval` seconds; returns packets sent."""
+    clock = clock if clock is not None else make_clock()
+    sent = 0
+    pass_number = 0
+    next_due = clock.now()
+    while True:
+        for index in range(len(table)):
+            packet = table.packet(index, pass_number)
+            port.write(packet + delimiter)
+            sent += 1
+            if verbose:
+                print(f"Sent: {packet.decode()}")
+            next_due += interval
+            clock.sleep(next_due - clock.now())
+        pass_number += 1
+        if not loop_mode or (passes is not None and pass_number >= passes):
+            return sent
+
+
+def main(argv):
+    import argparse
+    import serial
+
+    parser = argparse.ArgumentParser(description="Replay a telemetry CSV over a serial port from memory")
+    parser.add_argument("file_path", help="telemetry_data_*.csv to replay")
+    parser.add_argument("com_port")
+    parser.add_argument("--baud-rate", type=int, default=9600)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between packets (default 1.0)")
+    parser.add_argument("--loop-mode", action="store_true", help="replay the file indefinitely")
+    parser.add_argument("--passes", type=int, help="stop after this many passes in loop mode")
+    parser.add_argument("--delimiter", default="\n", help='packet delimiter (default "\\n")')
+    parser.add_argument("--quiet", action="store_true", help="do not print every packet")
+    args = parser.parse_args(argv)
+
+    table = ReplayTable(args.file_path)
+    delimiter = args.delimiter.encode().decode("unicode_escape").encode()
+    print(f"✅ Loaded {len(table)} packets from {args.file_path}")
+
+    port = serial.Serial(args.com_port, args.baud_rate, timeout=1)
+    try:
+        replay(table, port, args.interval, args.loop_mode, args.passes, delimiter, verbose=not args.quiet)
+    except KeyboardInterrupt:
+        print("🛑 Replay stopped by user.")
+    finally:
+        port.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
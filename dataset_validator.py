@@ -0,0 +1,381 @@
+"""
+Vectorized validation and profiling of telemetry CSV datasets.
+
+Checks generated or recorded telemetry_data_*.csv files against the
+load_constants() ranges of their mission year: value ranges (ALTITUDE per
+STATE), TEAM_ID, state ordering, monotonic PACKET_COUNT / MISSION_TIME,
+GPS_ALTITUDE vs ALTITUDE consistency and CHECKSUM. The file is read once,
+in blocks of whole lines: checksums are computed straight from each
+block's raw bytes with NumPy, and the same bytes are parsed into columns
+(by pyarrow when installed, pandas otherwise) and checked as whole arrays.
+"""
+
+import io
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional: faster multi-threaded columnar reads
+    pa = None
+
+from checksum import CHECKSUM_LIMIT
+from constants import load_constants
+
+RAW_BLOCK_BYTES = 64 * 1024 * 1024
+GPS_ALTITUDE_TOLERANCE = 50.0  # m between GPS_ALTITUDE and ALTITUDE
+
+# Column -> constants key holding its (min, max) range
+RANGE_COLUMNS = {
+    "TEMPERATURE": "temperature_range",
+    "PRESSURE": "pressure_range",
+    "VOLTAGE": "voltage_range",
+    "CURRENT": "current_range",
+    "GYRO_R": "gyro_range", "GYRO_P": "gyro_range", "GYRO_Y": "gyro_range",
+    "ACCEL_R": "accel_range", "ACCEL_P": "accel_range", "ACCEL_Y": "accel_range",
+    "MAG_R": "mag_range", "MAG_P": "mag_range", "MAG_Y": "mag_range",
+    "AUTO_GYRO_ROTATION_RATE": "rotation_rate_range",
+    "GPS_ALTITUDE": "gps_altitude_range",
+    "GPS_LATITUDE": "latitude_range",
+    "GPS_LONGITUDE": "longitude_range",
+    "GPS_SATS": "gps_sats_range",
+}
+NON_NUMERIC = {"TEAM_ID", "MISSION_TIME", "MODE", "STATE", "GPS_TIME", "CMD_ECHO"}
+
+
+# === SINGLE-PASS BLOCK READS ===
+def read_blocks(path, block_bytes=RAW_BLOCK_BYTES):
+    """Yield blocks of complete data lines (header excluded) from one pass over the file."""
+    with open(path, "rb") as f:
+        header_skipped = False
+        carry = b""
+        while True:
+            block = f.read(block_bytes)
+            data = carry + block
+            if not block:
+                if data and not data.isspace():
+                    yield data + b"\n"
+                return
+            cut = data.rfind(b"\n") + 1
+            carry = data[cut:]
+            data = data[:cut]
+            if not header_skipped:
+                data = data[data.find(b"\n") + 1:]
+                header_skipped = True
+            if data and not data.isspace():
+                yield data
+
+
+def line_bounds(buf):
+    """(start, end) byte offsets of every non-empty line in a block, line terminators excluded."""
+    ends = np.flatnonzero(buf == ord("\n"))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    ends = ends - (buf[np.maximum(ends - 1, 0)] == ord("\r"))
+    keep = ends > starts
+    return starts[keep], ends[keep]
+
+
+def well_formed(data, n_fields):
+    """(block with only the lines that have n_fields fields, mask of kept lines, their bounds).
+
+    Truncated last lines and whitespace-only lines would stop the CSV
+    parser, so they are dropped here, before both parsing and checksums.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    starts, ends = line_bounds(buf)
+    if starts.size == 0:
+        return data, np.zeros(0, dtype=bool), (starts, ends)
+    fields = np.add.reduceat(buf == ord(","), starts, dtype=np.int32)
+    # Each sum runs up to the next line's start; the bytes in between are terminators only
+    good = fields + 1 == n_fields
+    if not good.all():
+        data = b"".join(data[a:b] + b"\n" for a, b in zip(starts[good], ends[good]))
+        starts, ends = line_bounds(np.frombuffer(data, dtype=np.uint8))
+    return data, good, (starts, ends)
+
+
+class TextColumn:
+    """Dictionary-encoded text column: integer codes into the distinct values."""
+
+    def __init__(self, codes, values):
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def from_arrow(cls, column):
+        encoded = column.combine_chunks().fill_null("").dictionary_encode()
+        return cls(encoded.indices.to_numpy(zero_copy_only=False), encoded.dictionary.to_pylist())
+
+    @classmethod
+    def from_pandas(cls, series):
+        codes, values = pd.factorize(series)
+        return cls(codes, list(values))
+
+    def per_value(self, fn):
+        """Apply fn to the distinct values (a list) and expand the result to every row."""
+        return np.asarray(fn(self.values))[self.codes]
+
+    def not_equal(self, value):
+        return self.per_value(lambda values: [v != value for v in values])
+
+    def differs_from(self, other):
+        """Row-wise self != other for a column of the same block."""
+        index = pd.Index(other.values).get_indexer(self.values)
+        return np.where(index[self.codes] < 0, True, index[self.codes] != other.codes)
+
+
+def parse_block(data, header):
+    """name -> float array (numeric columns) or TextColumn for one block of data lines.
+
+    pyarrow parses with fixed column types. A block holding a non-numeric
+    value is read again as text and converted column by column, so only
+    the offending columns go through pandas, which turns such values into
+    NaN; they are reported as "not numeric" instead of aborting the run.
+    """
+    if pa is not None:
+        # Thread hand-off only costs time when there is a single core to run on
+        read_options = pa_csv.ReadOptions(column_names=list(header), use_threads=pa.cpu_count() > 1)
+        column_types = {name: pa.string() if name in NON_NUMERIC else pa.float64() for name in header}
+        try:
+            table = pa_csv.read_csv(io.BytesIO(data), read_options=read_options,
+                                    convert_options=pa_csv.ConvertOptions(column_types=column_types))
+        except pa.ArrowInvalid:
+            table = pa_csv.read_csv(io.BytesIO(data), read_options=read_options,
+                                    convert_options=pa_csv.ConvertOptions(
+                                        column_types={name: pa.string() for name in header},
+                                        strings_can_be_null=True))
+        return {name: TextColumn.from_arrow(table.column(name)) if name in NON_NUMERIC
+                else _arrow_floats(table.column(name)) for name in header}
+    frame = pd.read_csv(io.BytesIO(data), header=None, names=list(header), dtype=str,
+                        keep_default_na=False, low_memory=False)
+    return {name: TextColumn.from_pandas(frame[name]) if name in NON_NUMERIC
+            else pd.to_numeric(frame[name], errors="coerce").to_numpy(dtype=float) for name in header}
+
+
+def _arrow_floats(column):
+    if column.type == pa.float64():
+        return column.to_numpy()
+    try:
+        return pa_compute.cast(column, pa.float64()).to_numpy()
+    except pa.ArrowInvalid:
+        return pd.to_numeric(column.to_numpy(zero_copy_only=False), errors="coerce").astype(float)
+
+
+# === RAW-BYTE CHECKSUMS ===
+def block_checksums(data, bounds=None):
+    """buatcs()-folded checksum of every data row in a block, from raw bytes."""
+    buf = np.frombuffer(data, dtype=np.uint8)
+    starts, ends = bounds if bounds is not None else line_bounds(buf)
+
+    # Checksummed region is the line up to and including the comma before
+    # the 1-3 digit CHECKSUM field
+    last_comma = np.where(buf[ends - 2] == ord(","), ends - 2,
+                          np.where(buf[ends - 3] == ord(","), ends - 3, ends - 4))
+    region_end = np.minimum(last_comma + 1, starts + CHECKSUM_LIMIT)
+
+    bounds = np.empty(2 * starts.size, dtype=np.int64)
+    bounds[0::2] = starts
+    bounds[1::2] = region_end
+    # A uint16 sum wraps modulo 65536, which is exactly buatcs()'s 16-bit total
+    total = np.add.reduceat(buf, bounds, dtype=np.uint16)[0::2].astype(np.int64)
+    return ~((total & 0xFF) + ((total >> 8) & 0xFF)) & 0xFF
+
+
+# === COLUMN STATISTICS ===
+class ColumnStats:
+    """Streaming count/min/max/mean/std over chunks."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.total += values.sum()
+        self.total_sq += np.square(values).sum()
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        mean = self.total / self.count
+        std = np.sqrt(max(self.total_sq / self.count - mean * mean, 0.0))
+        return {"count": self.count, "min": self.min, "max": self.max, "mean": mean, "std": std}
+
+
+class Report:
+    """Issue counts with the first few offending row numbers."""
+
+    def __init__(self):
+        self.issues = {}
+
+    def add(self, check, mask, row_numbers, severity="error"):
+        """Count the rows flagged in mask; row_numbers holds their 1-based data row numbers."""
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return
+        entry = self.issues.setdefault(check, {"severity": severity, "count": 0, "rows": []})
+        entry["count"] += int(rows.size)
+        if len(entry["rows"]) < 5:
+            entry["rows"] += [int(row_numbers[r]) for r in rows[:5 - len(entry["rows"])]]
+
+    def errors(self):
+        return sum(e["count"] for e in self.issues.values() if e["severity"] == "error")
+
+
+# === VALIDATION ===
+def hms_seconds(values):
+    """Vectorized HH:MM:SS -> seconds (NaN where malformed)."""
+    raw = np.array([v.encode("ascii", "replace")[:8] for v in values], dtype="S8")
+    digits = np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(-1, 8).astype(np.int64) - ord("0")
+    seconds = ((digits[:, 0] * 10 + digits[:, 1]) * 3600 + (digits[:, 3] * 10 + digits[:, 4]) * 60
+               + digits[:, 6] * 10 + digits[:, 7]).astype(float)
+    is_digit = (digits >= 0) & (digits <= 9)
+    well_formed = (is_digit[:, [0, 1, 3, 4, 6, 7]].all(axis=1)
+                   & (digits[:, 2] == ord(":") - ord("0")) & (digits[:, 5] == ord(":") - ord("0")))
+    seconds[~well_formed] = np.nan
+    return seconds
+
+
+def detect_year(path, columns):
+    match = re.search(r"(20\d\d)", path)
+    if match:
+        return int(match.group(1))
+    return 2026 if "CURRENT" in columns else 2025
+
+
+def validate(path, year=None, block_bytes=RAW_BLOCK_BYTES):
+    """Validate a telemetry CSV; returns (report, stats, rows, year)."""
+    header = pd.read_csv(path, nrows=0).columns
+    year = year or detect_year(path, header)
+    config = load_constants(year)
+    state_codes = {state: i for i, state in enumerate(config["STATES"])}
+    alt_lo = np.array([config["altitude_values"][s][0] for s in config["STATES"]])
+    alt_hi = np.array([config["altitude_values"][s][1] for s in config["STATES"]])
+
+    report = Report()
+    stats = {}
+    has_checksum = "CHECKSUM" in header
+
+    rows = lines = 0
+    last_count = last_time = last_state = None
+    for data in read_blocks(path, block_bytes):
+        data, good, bounds = well_formed(data, len(header))
+        report.add(f"malformed row (not {len(header)} fields)", ~good, np.arange(lines, lines + good.size) + 1)
+        row_numbers = lines + np.flatnonzero(good) + 1
+        lines += good.size
+        n = row_numbers.size
+        if n == 0:
+            continue
+        chunk = parse_block(data, header)
+
+        # --- Numeric ranges and statistics ---
+        for column, values in chunk.items():
+            if not column or column in NON_NUMERIC or column.startswith("Unnamed"):
+                continue
+            stats.setdefault(column, ColumnStats()).update(values)
+            report.add(f"{column} not numeric", np.isnan(values), row_numbers)
+            key = RANGE_COLUMNS.get(column)
+            if key and config.get(key) is not None:
+                lo, hi = config[key]
+                report.add(f"{column} outside {key} {lo}..{hi}", (values < lo) | (values > hi), row_numbers)
+
+        # --- Identity ---
+        if "TEAM_ID" in chunk:
+            report.add(f"TEAM_ID != {config['TEAM_ID']}", chunk["TEAM_ID"].not_equal(config["TEAM_ID"]), row_numbers)
+
+        # --- States: known, ordered, and ALTITUDE within the state's band ---
+        if "STATE" in chunk:
+            codes = chunk["STATE"].per_value(lambda values: [state_codes.get(v, -1) for v in values])
+            unknown = codes < 0
+            report.add("STATE unknown", unknown, row_numbers)
+            previous = np.concatenate(([codes[0] if last_state is None else last_state], codes[:-1]))
+            report.add("STATE went backwards", (codes < previous) & ~unknown, row_numbers)
+            last_state = codes[-1]
+            if "ALTITUDE" in chunk:
+                altitude = chunk["ALTITUDE"]
+                valid = ~unknown
+                band = np.zeros(n, dtype=bool)
+                band[valid] = (altitude[valid] < alt_lo[codes[valid]]) | (altitude[valid] > alt_hi[codes[valid]])
+                report.add("ALTITUDE outside STATE band", band, row_numbers)
+                if "GPS_ALTITUDE" in chunk:
+                    report.add(f"|GPS_ALTITUDE - ALTITUDE| > {GPS_ALTITUDE_TOLERANCE:g} m",
+                               np.abs(chunk["GPS_ALTITUDE"] - altitude) > GPS_ALTITUDE_TOLERANCE,
+                               row_numbers, "warning")
+
+        # --- Monotonic counters ---
+        if "PACKET_COUNT" in chunk:
+            count = chunk["PACKET_COUNT"]
+            step = np.diff(count, prepend=count[0] - 1 if last_count is None else last_count)
+            report.add("PACKET_COUNT not increasing", step <= 0, row_numbers)
+            report.add("PACKET_COUNT gap", step > 1, row_numbers, "warning")
+            last_count = count[-1]
+        if "MISSION_TIME" in chunk:
+            seconds = chunk["MISSION_TIME"].per_value(hms_seconds)
+            report.add("MISSION_TIME malformed", np.isnan(seconds), row_numbers)
+            step = np.diff(seconds, prepend=seconds[0] if last_time is None else last_time)
+            report.add("MISSION_TIME went backwards", step < 0, row_numbers)
+            last_time = seconds[-1]
+            if "GPS_TIME" in chunk:
+                report.add("GPS_TIME != MISSION_TIME", chunk["GPS_TIME"].differs_from(chunk["MISSION_TIME"]),
+                           row_numbers, "warning")
+
+        # --- Checksums ---
+        if has_checksum:
+            report.add("CHECKSUM mismatch", chunk["CHECKSUM"] != block_checksums(data, bounds), row_numbers)
+
+        rows += n
+
+    return report, stats, rows, year
+
+
+def print_report(path, report, stats, rows, year):
+    print(f"📋 {path}: {rows:,} rows, mission year {year}")
+    print(f"\n{'COLUMN':<26}{'COUNT':>12}{'MIN':>12}{'MAX':>12}{'MEAN':>12}{'STD':>12}")
+    for column, column_stats in stats.items():
+        s = column_stats.summary()
+        if s["count"]:
+            print(f"{column:<26}{s['count']:>12,}{s['min']:>12.3f}{s['max']:>12.3f}{s['mean']:>12.3f}{s['std']:>12.3f}")
+    print()
+    if not report.issues:
+        print("✅ No issues found")
+        return
+    for check, entry in report.issues.items():
+        icon = "❌" if entry["severity"] == "error" else "⚠️"
+        rows_list = ", ".join(map(str, entry["rows"]))
+        print(f"{icon} {check}: {entry['count']:,} rows (first rows: {rows_list})")
+
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate and profile telemetry CSV datasets")
+    parser.add_argument("files", nargs="+", help="telemetry CSV files")
+    parser.add_argument("--year", type=int, help="mission year (default: from file name or columns)")
+    parser.add_argument("--block-mb", type=int, default=RAW_BLOCK_BYTES // (1024 * 1024),
+                        help="bytes read and parsed per block (MiB)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in args.files:
+        report, stats, rows, year = validate(path, args.year, args.block_mb * 1024 * 1024)
+        print_report(path, report, stats, rows, year)
+        failed |= report.errors() > 0
+        print()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,251 @@
+"""
+Incremental flight dynamics model for the CanSat simulators.
+
+Integrates altitude, vertical velocity, attitude and descent rate per tick
+and derives pressure and temperature from the standard atmosphere. All
+vehicles are stepped together as NumPy arrays, so the cost of a tick does
+not grow with per-vehicle Python work.
+"""
+
+import numpy as np
+
+# === STANDARD ATMOSPHERE (ISA, troposphere) ===
+G0 = 9.80665              # m/s²
+SEA_LEVEL_PRESSURE = 101.325  # kPa
+SEA_LEVEL_TEMP_K = 288.15     # K
+ZERO_CELSIUS_K = 273.15       # K
+LAPSE_RATE = 0.0065           # K/m
+ISA_EXPONENT = 5.25588        # g*M / (R*L)
+
+# === FLIGHT STATES (index == phase code) ===
+STATES = [
+    "LAUNCH_PAD",
+    "ASCENT",
+    "APOGEE",
+    "DESCENT",
+    "PROBE_RELEASE",
+    "PAYLOAD_RELEASE",
+    "LANDED",
+]
+LAUNCH_PAD, ASCENT, APOGEE, DESCENT, PROBE_RELEASE, PAYLOAD_RELEASE, LANDED = range(len(STATES))
+
+
+def isa_pressure(altitude_m, ground_altitude_m=0.0, ground_temp_c=15.0):
+    """Static pressure in kPa at the given height above ground.
+
+    The temperature profile is the one isa_temperature() uses (ground_temp_c
+    at ground level), so pressure and temperature describe the same air.
+    The defaults give the standard atmosphere.
+    """
+    h = np.asarray(altitude_m, dtype=float) + ground_altitude_m
+    sea_level_temp_k = ground_temp_c + ZERO_CELSIUS_K + LAPSE_RATE * ground_altitude_m
+    return SEA_LEVEL_PRESSURE * (1.0 - LAPSE_RATE * h / sea_level_temp_k) ** ISA_EXPONENT
+
+
+def isa_temperature(altitude_m, ground_temp_c=15.0):
+    """Air temperature in °C at the given height above ground."""
+    return ground_temp_c - LAPSE_RATE * np.asarray(altitude_m, dtype=float)
+
+
+def pressure_to_altitude(pressure_kpa, ground_pressure_kpa=SEA_LEVEL_PRESSURE, ground_temp_c=15.0):
+    """Inverse of isa_pressure: height in meters above the reference pressure."""
+    ratio = np.asarray(pressure_kpa, dtype=float) / ground_pressure_kpa
+    return (ground_temp_c + ZERO_CELSIUS_K) / LAPSE_RATE * (1.0 - ratio ** (1.0 / ISA_EXPONENT))
+
+
+class FlightDynamics:
+    """Vectorized point-mass flight model for one or many CanSats."""
+
+    def __init__(self, n_vehicles=1, apogee=700.0, burn_time=2.0,
+                 apogee_hold=2.0, parachute_rate=15.0, glide_rate=5.0,
+                 probe_release_alt=300.0, payload_release_alt=100.0,
+                 ground_temp_c=30.0, ground_altitude=0.0, max_substep=0.05,
+                 sensor_noise=True, seed=None):
+        self.n = n_vehicles
+        self.rng = np.random.default_rng(seed)
+        self.burn_time = burn_time
+        self.apogee_hold = apogee_hold
+        self.probe_release_alt = probe_release_alt
+        self.payload_release_alt = payload_release_alt
+        self.ground_temp_c = ground_temp_c
+        self.ground_altitude = ground_altitude
+        self.max_substep = max_substep
+        self.sensor_noise = sensor_noise
+
+        # Per-vehicle target apogee (±3%) -> net boost acceleration.
+        # Solves h_burn + h_coast = H for a: (tb²/2g)a² + (tb²/2)a - H = 0
+        target = apogee * self.rng.uniform(0.97, 1.03, n_vehicles)
+        qa = burn_time ** 2 / (2.0 * G0)
+        qb = burn_time ** 2 / 2.0
+        self.boost_accel = (-qb + np.sqrt(qb * qb + 4.0 * qa * target)) / (2.0 * qa)
+
+        # Descent rates per phase (m/s, positive down)
+        self.descent_rate = np.zeros((n_vehicles, len(STATES)))
+        self.descent_rate[:, DESCENT] = parachute_rate * self.rng.uniform(0.9, 1.1, n_vehicles)
+        self.descent_rate[:, PROBE_RELEASE] = glide_rate * self.rng.uniform(0.9, 1.1, n_vehicles)
+        self.descent_rate[:, PAYLOAD_RELEASE] = self.descent_rate[:, PROBE_RELEASE]
+
+        self.reset()
+
+    # === STATE ===
+    def reset(self):
+        """Put every vehicle back on the launch pad."""
+        n = self.n
+        self.time = 0.0
+        self.phase = np.full(n, LAUNCH_PAD, dtype=np.int8)
+        self.phase_time = np.zeros(n)
+        self.altitude = np.zeros(n)
+        self.velocity = np.zeros(n)
+        self.specific_force = np.full(n, G0)
+        self.max_altitude = np.zeros(n)
+        self.attitude = np.zeros((n, 3))        # roll, pitch, yaw (deg)
+        self.attitude[:, 2] = self.rng.uniform(0.0, 360.0, n)
+        self.rates = np.zeros((n, 3))           # deg/s
+
+    def launch(self, mask=None):
+        """Ignite the selected vehicles (all by default) still on the pad."""
+        sel = self.phase == LAUNCH_PAD
+        if mask is not None:
+            sel &= mask
+        self.phase[sel] = ASCENT
+        self.phase_time[sel] = 0.0
+
+    # === INTEGRATION ===
+    def step(self, dt):
+        """Advance every vehicle by dt seconds (sub-stepped for stability)."""
+        if dt <= 0:
+            return
+        n_sub = max(1, int(np.ceil(dt / self.max_substep)))
+        h = dt / n_sub
+        for _ in range(n_sub):
+            self._substep(h)
+        self.time += dt
+
+    def _substep(self, h):
+        phase = self.phase
+        v_prev = self.velocity.copy()
+
+        # --- Vertical acceleration per phase ---
+        accel = np.zeros(self.n)
+        boosting = (phase == ASCENT) & (self.phase_time < self.burn_time)
+        accel[boosting] = self.boost_accel[boosting]
+        accel[(phase == ASCENT) & ~boosting] = -G0
+        accel[phase == APOGEE] = -G0
+
+        # Under canopy: first-order approach to the phase's descent rate
+        canopy = (phase >= DESCENT) & (phase < LANDED)
+        if canopy.any():
+            target_v = -self.descent_rate[np.arange(self.n), phase]
+            tau = 1.5
+            accel[canopy] = (target_v[canopy] - self.velocity[canopy]) / tau
+
+        self.velocity += accel * h
+        self.altitude += self.velocity * h
+        self.phase_time += h
+
+        # --- Ground contact ---
+        flying = (phase != LAUNCH_PAD) & (phase != LANDED)
+        touchdown = flying & (self.altitude <= 0.0) & (self.phase_time > 0.5)
+        self.altitude[phase == LAUNCH_PAD] = 0.0
+        self.altitude = np.maximum(self.altitude, 0.0)
+        self.velocity[touchdown | (phase == LANDED) | (phase == LAUNCH_PAD)] = 0.0
+        np.maximum(self.max_altitude, self.altitude, out=self.max_altitude)
+
+        # --- Phase transitions ---
+        self._transition((phase == ASCENT) & ~boosting & (self.velocity <= 0.0), APOGEE)
+        self._transition((phase == APOGEE) & (self.phase_time >= self.apogee_hold), DESCENT)
+        self._transition((phase == DESCENT) & (self.altitude <= self.probe_release_alt), PROBE_RELEASE)
+        self._transition((phase == PROBE_RELEASE) & (self.altitude <= self.payload_release_alt), PAYLOAD_RELEASE)
+        self._transition(touchdown, LANDED)
+
+        # Specific force seen by the accelerometer (z axis, m/s²)
+        self.specific_force = (self.velocity - v_prev) / h + G0
+        self.specific_force[self.phase == LANDED] = G0
+
+        self._step_attitude(h)
+
+    def _transition(self, mask, new_phase):
+        if mask.any():
+            self.phase[mask] = new_phase
+            self.phase_time[mask] = 0.0
+
+    def _step_attitude(self, h):
+        """Ornstein-Uhlenbeck body rates, larger in flight than on the ground."""
+        flying = ((self.phase != LAUNCH_PAD) & (self.phase != LANDED))[:, None]
+        sigma = np.where(flying, np.array([40.0, 25.0, 60.0]), 0.5)
+        theta = 0.8
+        noise = self.rng.standard_normal((self.n, 3))
+        self.rates += -theta * self.rates * h + sigma * np.sqrt(2.0 * theta * h) * noise
+        self.attitude += self.rates * h
+        # Canopy keeps roll/pitch bounded; yaw wraps freely
+        self.attitude[:, :2] *= np.where(flying, 1.0 - 0.5 * h, 1.0 - 2.0 * h)
+        self.attitude[:, 2] %= 360.0
+
+    # === DERIVED SENSORS ===
+    def pressure(self):
+        """Static pressure in kPa for every vehicle."""
+        return isa_pressure(self.altitude, self.ground_altitude, self.ground_temp_c)
+
+    def temperature(self):
+        """Air temperature in °C for every vehicle."""
+        return isa_temperature(self.altitude, self.ground_temp_c)
+
+    def descent_speed(self):
+        """Descent rate in m/s (positive down)."""
+        return np.maximum(-self.velocity, 0.0)
+
+    def gyro(self):
+        """Body rates in deg/s, shape (n, 3)."""
+        if not self.sensor_noise:
+            return self.rates.copy()
+        return self.rates + self.rng.normal(0.0, 0.2, (self.n, 3))
+
+    def accel(self):
+        """Accelerometer reading in m/s², shape (n, 3), gravity on the Y axis."""
+        out = np.zeros((self.n, 3))
+        out[:, 2] = self.specific_force
+        if self.sensor_noise:
+            out += self.rng.normal(0.0, 0.05, (self.n, 3))
+        return out
+
+    def state_name(self, i=0):
+        """Flight state string for vehicle i."""
+        return STATES[int(self.phase[i])]
+
+    def sample(self, i=0):
+        """Snapshot of vehicle i as rounded telemetry values."""
+        gyro = self.gyro()[i]
+        accel = self.accel()[i]
+        roll, pitch, yaw = self.attitude[i]
+        return {
+            "STATE": self.state_name(i),
+            "ALTITUDE": round(float(self.altitude[i]), 1),
+            "TEMPERATURE": round(float(self.temperature()[i]), 1),
+            "PRESSURE": round(float(self.pressure()[i]), 1),
+            "DESCENT_RATE": round(float(self.descent_speed()[i]), 1),
+            "GYRO_R": round(float(gyro[0]), 1),
+            "GYRO_P": round(float(gyro[1]), 1),
+            "GYRO_Y": round(float(gyro[2]), 1),
+            "ACCEL_R": round(float(accel[0]), 1),
+            "ACCEL_P": round(float(accel[1]), 1),
+            "ACCEL_Y": round(float(accel[2]), 1),
+            "ROLL": round(float(roll), 1),
+            "PITCH": round(float(pitch), 1),
+            "YAW": round(float(yaw), 1),
+        }
+
+
+def simulate_flights(n_vehicles, duration, rate_hz=1.0, **kwargs):
+    """Run n_vehicles full flights and return (time, altitude, phase) arrays sampled at rate_hz."""
+    model = FlightDynamics(n_vehicles, **kwargs)
+    model.launch()
+    n_ticks = int(duration * rate_hz) + 1
+    times = np.arange(n_ticks) / rate_hz
+    altitude = np.empty((n_ticks, n_vehicles))
+    phase = np.empty((n_ticks, n_vehicles), dtype=np.int8)
+    for k in range(n_ticks):
+        if k:
+            model.step(1.0 / rate_hz)
+        altitude[k] = model.altitude
+        phase[k] = model.phase
+    return times, altitude, phase
@@ -0,0 +1,278 @@
+"""
+Per-packet latency tracing between the simulators and the ground station.
+
+MISSION_TIME only has one-second resolution, so PacketTracer tags each
+packet with a sequence ID and a time.monotonic_ns() send timestamp, taken
+just before the packet is handed to the port. Two modes are available:
+
+    field    append one trailing field "<seq>@<send_ns>" after the last
+             field (after CHECKSUM in the 2025/26 format); the checksum
+             still covers exactly the same bytes
+    sidecar  leave packets untouched and write "seq,send_ns,crc32" rows to
+             a CSV file; packets are matched by the CRC32 of the line
+
+With tracing disabled, nothing is added and packets are byte-identical.
+
+The correlator joins the send stamps with capture logs (session_capture):
+a TX log recorded on the simulator side (the moment the port write happens,
+i.e. after any TX queue) and an RX log recorded by the receiver, plus any
+number of extra stage files ("seq,ns" or "crc32,ns" CSVs, e.g. from the
+ground-station UI). It prints a latency histogram for every pipeline stage.
+Timestamps are CLOCK_MONOTONIC, so all logs must come from the same host
+(a virtual serial pair or loopback network).
+"""
+
+import csv
+import json
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from session_capture import TX, RX, read_capture
+
+TRACE_SEPARATOR = b"@"
+HISTOGRAM_EDGES_MS = [0, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float("inf")]
+
+
+# === SENDER SIDE ===
+class PacketTracer:
+    """Stamps outgoing packets with a sequence ID and a monotonic send time."""
+
+    def __init__(self, mode="field", sidecar_path=None):
+        if mode not in ("field", "sidecar"):
+            raise ValueError(f"unknown trace mode '{mode}' (choose field or sidecar)")
+        if mode == "sidecar" and not sidecar_path:
+            raise ValueError("sidecar tracing needs a sidecar_path")
+        self.mode = mode
+        self.seq = 0
+        self._sidecar = None
+        if mode == "sidecar":
+            self._sidecar = open(sidecar_path, "w", buffering=64 * 1024)
+            self._sidecar.write("seq,send_ns,crc32\n")
+
+    def stamp(self, line):
+        """Return the line to transmit (without the line terminator)."""
+        self.seq += 1
+        send_ns = time.monotonic_ns()
+        if self.mode == "field":
+            return f"{line},{self.seq}@{send_ns}"
+        self._sidecar.write(f"{self.seq},{send_ns},{zlib.crc32(line.encode())}\n")
+        return line
+
+    def close(self):
+        if self._sidecar is not None:
+            self._sidecar.close()
+
+
+# === PARSING ===
+def trace_stamp(payload):
+    """(seq, send_ns) from a field-mode packet, or None (also for a malformed trailer)."""
+    last = payload.rstrip(b"\r\n").rsplit(b",", 1)[-1]
+    seq, sep, send_ns = last.partition(TRACE_SEPARATOR)
+    if not sep or not seq.isdigit() or not send_ns.isdigit():
+        return None
+    return int(seq), int(send_ns)
+
+
+def trace_key(payload):
+    """Join key for a received/transmitted line: ("seq", n) or ("crc", crc32)."""
+    stamp = trace_stamp(payload)
+    if stamp is not None:
+        return ("seq", stamp[0])
+    return ("crc", zlib.crc32(payload.rstrip(b"\r\n")))
+
+
+def capture_times(path, direction, send=None):
+    """key -> first timestamp for every packet line in a capture log.
+
+    Trailing-field stamps found on the way are added to `send` if given.
+    """
+    times = {}
+    for frame_dir, ts, payload in read_capture(path):
+        if frame_dir != direction:
+            continue
+        for line in payload.splitlines():
+            if not line or line.startswith(b"TEAM_ID"):
+                continue
+            if send is not None:
+                stamp = trace_stamp(line)
+                if stamp is not None:
+                    send.setdefault(("seq", stamp[0]), stamp[1])
+            times.setdefault(trace_key(line), ts)
+    return times
+
+
+def load_sidecar(path):
+    """(send times keyed by seq, crc32 -> seq map) from a sidecar CSV."""
+    send, crc_to_seq = {}, {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            seq = int(row["seq"])
+            send[("seq", seq)] = int(row["send_ns"])
+            crc_to_seq[int(row["crc32"])] = seq
+    return send, crc_to_seq
+
+
+def load_stage_file(path):
+    """key -> ns from a "seq,ns" or "crc32,ns" CSV (header names the key column)."""
+    times = {}
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        key_name, _ = next(reader)
+        kind = "crc" if key_name.strip().lower().startswith("crc") else "seq"
+        for key, ns in reader:
+            times[(kind, int(key))] = int(ns)
+    return times
+
+
+# === CORRELATION ===
+def correlate(rx_path, tx_path=None, sidecar_path=None, stages=None):
+    """Per-stage latency arrays (ms) keyed by stage name, plus match counts.
+
+    Stage timestamps, in pipeline order: send (trace stamp), tx (simulator
+    TX capture), rx (receiver RX capture), then any extra stages.
+    """
+    crc_to_seq = {}
+    if sidecar_path:
+        send, crc_to_seq = load_sidecar(sidecar_path)
+    else:
+        send = {}
+
+    def normalize(times):
+        # Fold CRC keys onto sequence IDs where the sidecar knows them
+        return {("seq", crc_to_seq[k[1]]) if k[0] == "crc" and k[1] in crc_to_seq else k: ts
+                for k, ts in times.items()}
+
+    points = []
+    if tx_path:
+        points.append(("tx", normalize(capture_times(tx_path, TX, send))))
+    rx = normalize(capture_times(rx_path, RX, send))
+    points.append(("rx", rx))
+    for name, path in (stages or {}).items():
+        points.append((name, normalize(load_stage_file(path))))
+
+    timeline = [("send", send)] + points
+    results = {}
+    for (prev_name, prev), (name, cur) in zip(timeline, timeline[1:]):
+        keys = prev.keys() & cur.keys()
+        results[f"{prev_name}->{name}"] = np.array([cur[k] - prev[k] for k in keys], dtype=np.int64) / 1e6
+    last_name, last = timeline[-1]
+    keys = send.keys() & last.keys()
+    results[f"send->{last_name} (end-to-end)"] = np.array([last[k] - send[k] for k in keys], dtype=np.int64) / 1e6
+    # Without a TX log or sidecar, field-mode send stamps come from the RX log
+    # itself, so packets that never arrived are invisible and loss is unknown
+    known_sent = tx_path is not None or sidecar_path is not None
+    counts = {"sent": len(send) if known_sent else None, "received": len(rx),
+              "lost": len(send.keys() - rx.keys()) if known_sent else None}
+    return results, counts
+
+
+def summarize(latencies_ms):
+    if latencies_ms.size == 0:
+        return {"count": 0}
+    p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99])
+    hist, _ = np.histogram(latencies_ms, bins=HISTOGRAM_EDGES_MS)
+    return {
+        "count": int(latencies_ms.size),
+        "min_ms": round(float(latencies_ms.min()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p90_ms": round(float(p90), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(latencies_ms.max()), 3),
+        "histogram": {f"<{hi:g}" if hi != float("inf") else f">={lo:g}": int(n)
+                      for lo, hi, n in zip(HISTOGRAM_EDGES_MS, HISTOGRAM_EDGES_MS[1:], hist)},
+    }
+
+
+def print_report(results, counts, width=40):
+    if counts["lost"] is None:
+        print(f"📦 Received {counts['received']}, loss unknown (needs --tx or --sidecar)")
+    else:
+        print(f"📦 Sent {counts['sent']}, received {counts['received']}, lost {counts['lost']}")
+    for stage, latencies in results.items():
+        summary = summarize(latencies)
+        print(f"\n⏱️  {stage}: {summary['count']} packets")
+        if not summary["count"]:
+            continue
+        print(f"   p50 {summary['p50_ms']} ms | p90 {summary['p90_ms']} ms | "
+              f"p99 {summary['p99_ms']} ms | max {summary['max_ms']} ms")
+        peak = max(summary["histogram"].values())
+        for label, n in summary["histogram"].items():
+            if n:
+                bar = "█" * max(1, round(width * n / peak))
+                print(f"   {label:>8} ms {bar} {n}")
+
+
+# === RECEIVER ===
+def record(port, path, duration=None):
+    """Receiver-side RX log: read lines from `port` into a capture log.
+
+    readline() returns partial lines when the port timeout expires first
+    (one line takes longer than 0.1 s at 9600 baud), so fragments are
+    buffered and each complete line is logged once, stamped on arrival of
+    its final byte.
+    """
+    from session_capture import CaptureWriter
+
+    writer = CaptureWriter(path, compress=path.endswith(".gz"))
+    deadline = time.monotonic() + duration if duration else None
+    pending = b""
+    lines = 0
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            chunk = port.readline()
+            if not chunk:
+                continue
+            pending += chunk
+            if pending.endswith(b"\n"):
+                writer.write_frame(RX, pending)
+                pending = b""
+                lines += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+        port.close()
+    print(f"💾 Recorded {lines} lines to {path}")
+
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record and correlate per-packet latency traces")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="log received lines with monotonic timestamps")
+    rec.add_argument("com_port")
+    rec.add_argument("output", help="capture log path (.gz to compress)")
+    rec.add_argument("--baud-rate", type=int, default=115200)
+    rec.add_argument("--duration", type=float, help="stop after N seconds (default: Ctrl+C)")
+
+    cor = sub.add_parser("correlate", help="join TX/RX logs into per-stage latency histograms")
+    cor.add_argument("rx", help="receiver capture log")
+    cor.add_argument("--tx", help="simulator capture log (--capture=FILE)")
+    cor.add_argument("--sidecar", help="sidecar CSV written in sidecar trace mode")
+    cor.add_argument("--stage", action="append", default=[], metavar="NAME=FILE",
+                     help="extra stage CSV (seq,ns or crc32,ns), in pipeline order")
+    cor.add_argument("--json", help="write the summaries as JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        import serial
+        record(serial.Serial(args.com_port, args.baud_rate, timeout=0.1), args.output, args.duration)
+        return
+
+    stages = dict(spec.split("=", 1) for spec in args.stage)
+    results, counts = correlate(args.rx, args.tx, args.sidecar, stages)
+    print_report(results, counts)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"counts": counts, "stages": {k: summarize(v) for k, v in results.items()}}, f, indent=2)
+        print(f"\n💾 Summary saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
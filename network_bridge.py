@@ -0,0 +1,232 @@
+"""
+TCP/UDP fan-out of the telemetry downlink.
+
+TelemetryBridge streams every packet to any number of TCP clients and UDP
+destinations using non-blocking sockets. Each TCP client has a bounded
+queue; when a client falls behind, its oldest packets are dropped, and a
+client that stays backed up is disconnected, so one lagging consumer never
+stalls the others. Lines sent by TCP clients are treated as uplink commands.
+
+It can stand in for (or mirror) the simulator's serial port, or run on its
+own to fan out a serial port such as the Rust transmitter's output.
+"""
+
+import selectors
+import socket
+import sys
+import time
+from collections import deque
+
+
+class _TcpClient:
+    """Per-connection state: bounded packet queue plus partial send/receive buffers."""
+
+    def __init__(self, sock, address, max_queue):
+        self.sock = sock
+        self.address = address
+        self.queue = deque()
+        self.max_queue = max_queue
+        self.pending = b""
+        self.inbox = b""
+        self.dropped = 0
+        self.sent = 0
+        self.full_since = None
+
+
+class TelemetryBridge:
+    """Non-blocking fan-out transport for TCP and UDP consumers."""
+
+    def __init__(self, tcp_port=None, udp_targets=(), host="0.0.0.0", port=None,
+                 max_queue=256, slow_timeout=5.0):
+        self.port = port                  # optional serial port to mirror
+        self.max_queue = max_queue
+        self.slow_timeout = slow_timeout
+        self.selector = selectors.DefaultSelector()
+        self.clients = {}
+        self.commands = deque()
+        self.udp_targets = [self._parse_target(t) for t in udp_targets]
+        self.udp_dropped = 0
+        self.disconnected_slow = 0
+
+        self.server = None
+        if tcp_port is not None:
+            self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.server.bind((host, tcp_port))
+            self.server.listen()
+            self.server.setblocking(False)
+            self.selector.register(self.server, selectors.EVENT_READ, None)
+            print(f"🌐 TCP telemetry server listening on {host}:{tcp_port}")
+
+        self.udp = None
+        if self.udp_targets:
+            self.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.udp.setblocking(False)
+            print(f"🌐 UDP telemetry to {', '.join(f'{h}:{p}' for h, p in self.udp_targets)}")
+
+    @staticmethod
+    def _parse_target(target):
+        if isinstance(target, tuple):
+            return target
+        host, _, port = target.rpartition(":")
+        return host or "127.0.0.1", int(port)
+
+    # === PUBLISH ===
+    def write(self, data):
+        """Queue a packet for every consumer and push as much as sockets accept."""
+        if self.port is not None:
+            self.port.write(data)
+        now = time.monotonic()
+        for client in list(self.clients.values()):
+            if len(client.queue) >= client.max_queue:
+                client.queue.popleft()
+                client.dropped += 1
+                if client.full_since is None:
+                    client.full_since = now
+                elif now - client.full_since > self.slow_timeout:
+                    print(f"🐢 Dropping slow client {client.address[0]}:{client.address[1]}")
+                    self.disconnected_slow += 1
+                    self._disconnect(client)
+                    continue
+            else:
+                client.full_since = None
+            client.queue.append(data)
+        for target in self.udp_targets:
+            try:
+                self.udp.sendto(data, target)
+            except (BlockingIOError, OSError):
+                self.udp_dropped += 1
+        self.pump()
+        return len(data)
+
+    def pump(self, timeout=0):
+        """Accept connections, read uplink lines and flush client queues."""
+        for key, events in self.selector.select(timeout):
+            if key.data is None:
+                self._accept()
+                continue
+            client = key.data
+            if events & selectors.EVENT_READ:
+                self._receive(client)
+        for client in list(self.clients.values()):
+            self._flush(client)
+
+    def _accept(self):
+        try:
+            sock, address = self.server.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = _TcpClient(sock, address, self.max_queue)
+        self.clients[sock] = client
+        self.selector.register(sock, selectors.EVENT_READ, client)
+        print(f"🔌 Client connected: {address[0]}:{address[1]}")
+
+    def _receive(self, client):
+        try:
+            chunk = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b""
+        if not chunk:
+            self._disconnect(client)
+            return
+        client.inbox += chunk
+        *lines, client.inbox = client.inbox.split(b"\n")
+        self.commands.extend(line.strip() + b"\n" for line in lines if line.strip())
+
+    def _flush(self, client):
+        while client.pending or client.queue:
+            if not client.pending:
+                # Coalesce queued packets into one send
+                client.pending = b"".join(client.queue)
+                client.sent += len(client.queue)
+                client.queue.clear()
+            try:
+                n = client.sock.send(client.pending)
+            except BlockingIOError:
+                return
+            except OSError:
+                self._disconnect(client)
+                return
+            client.pending = client.pending[n:]
+
+    def _disconnect(self, client):
+        self.clients.pop(client.sock, None)
+        try:
+            self.selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+    # === SERIAL-PORT INTERFACE ===
+    @property
+    def in_waiting(self):
+        if self.port is not None and self.port.in_waiting:
+            return self.port.in_waiting
+        if not self.commands:
+            self.pump()
+        return len(self.commands)
+
+    def readline(self):
+        if self.port is not None and self.port.in_waiting:
+            return self.port.readline()
+        return self.commands.popleft() if self.commands else b""
+
+    def stats(self):
+        """Per-client sent/dropped/queued counters."""
+        return {
+            f"{c.address[0]}:{c.address[1]}": {"sent": c.sent, "dropped": c.dropped, "queued": len(c.queue)}
+            for c in self.clients.values()
+        }
+
+    def close(self):
+        for client in list(self.clients.values()):
+            self._disconnect(client)
+        if self.server is not None:
+            self.selector.unregister(self.server)
+            self.server.close()
+        if self.udp is not None:
+            self.udp.close()
+        self.selector.close()
+        if self.port is not None:
+            self.port.close()
+
+
+def main(argv):
+    """Fan out a serial port's downlink to TCP/UDP consumers."""
+    import argparse
+    import serial
+
+    parser = argparse.ArgumentParser(description="Mirror a serial telemetry downlink to TCP/UDP clients")
+    parser.add_argument("com_port", help="serial port carrying the telemetry downlink")
+    parser.add_argument("--baud-rate", type=int, default=115200)
+    parser.add_argument("--tcp", type=int, default=5760, help="TCP port to serve (default 5760)")
+    parser.add_argument("--udp", action="append", default=[], metavar="HOST:PORT", help="UDP destination (repeatable)")
+    parser.add_argument("--max-queue", type=int, default=256, help="packets buffered per TCP client")
+    args = parser.parse_args(argv)
+
+    port = serial.Serial(args.com_port, args.baud_rate, timeout=0.05)
+    bridge = TelemetryBridge(args.tcp, args.udp, max_queue=args.max_queue)
+    print(f"📡 Bridging {args.com_port} at {args.baud_rate} baud")
+    try:
+        while True:
+            line = port.readline()
+            if line:
+                bridge.write(line)
+            else:
+                bridge.pump()
+            # Uplink from network clients goes back out on the serial port
+            while bridge.commands:
+                port.write(bridge.commands.popleft())
+    except KeyboardInterrupt:
+        print("\n⏹️  Bridge stopped")
+    finally:
+        bridge.close()
+        port.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
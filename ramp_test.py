@@ -0,0 +1,331 @@
+"""
+Load-generation ramp for ground-station capacity testing.
+
+Drives CanSatSimulator's telemetry loop through a schedule of steps that
+raise the packet rate (and optionally the number of vehicles and the
+packet size). Delivered packets are counted in one of two ways:
+
+    gs_port          ramp_test reads the ground-station end of the port pair
+                     itself and sends PING probe commands to time the
+                     command-to-CMD_ECHO round trip. This measures the link
+                     and a pyserial reader, not the ground-station software.
+    receiver report  the real ground station appends its cumulative packet
+                     count ("packets[,bytes]" per line) to a file, which is
+                     read at the start and end of each step. No probes.
+
+The ramp stops at the first step whose loss or p95 echo latency crosses
+the thresholds and reports the maximum sustainable packet rate for the
+baud rate and packet format in use.
+"""
+
+import json
+import math
+import sys
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import numpy as np
+
+CMD_ECHO_FIELD = 21
+
+
+@dataclass
+class RampStep:
+    rate_hz: float
+    vehicles: int = 1
+    pad_bytes: int = 0
+    duration: float = 5.0
+
+
+@dataclass
+class StepResult:
+    rate_hz: float
+    vehicles: int
+    pad_bytes: int
+    sent: int
+    received: int
+    loss: float
+    packets_per_s: float
+    bytes_per_s: float
+    link_utilization: Optional[float]
+    probes: int
+    probe_timeouts: int
+    echo_p50_ms: Optional[float]
+    echo_p95_ms: Optional[float]
+    passed: bool
+
+
+def build_schedule(rates, vehicles=1, pad_bytes=0, duration=5.0):
+    return [RampStep(rate, vehicles, pad_bytes, duration) for rate in rates]
+
+
+def echo_field(line):
+    fields = line.split(b",", CMD_ECHO_FIELD + 1)
+    return fields[CMD_ECHO_FIELD].decode(errors="replace") if len(fields) > CMD_ECHO_FIELD else None
+
+
+class ReceiverReport:
+    """Cumulative packet counter written by the ground station ("packets[,bytes]" lines)."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def totals(self):
+        """(packets, bytes or None) from the last complete line, (0, None) if empty."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, 2)
+                f.seek(max(0, f.tell() - 256))
+                lines = [l for l in f.read().splitlines() if l.strip()]
+        except FileNotFoundError:
+            return 0, None
+        for line in reversed(lines):
+            fields = line.split(b",")
+            try:
+                return int(fields[0]), int(fields[1]) if len(fields) > 1 else None
+            except ValueError:
+                continue
+        return 0, None
+
+
+class RampTest:
+    """Ramps a simulator's packet rate against a ground-station-side port or receiver report."""
+
+    def __init__(self, simulator, gs_port=None, baudrate=None, max_loss=0.01, max_echo_latency=1.0,
+                 probe_interval=0.5, receiver=None, settle=0.5):
+        if gs_port is None and receiver is None:
+            raise ValueError("need a ground-station port or a receiver report")
+        self.sim = simulator
+        self.sim.verbose = False
+        self.gs_port = gs_port
+        self.receiver = receiver
+        self.baudrate = baudrate or getattr(gs_port, "baudrate", None)
+        self.max_loss = max_loss
+        self.max_echo_latency = max_echo_latency
+        self.probe_interval = probe_interval
+        self.settle = settle
+
+    # === SENDER (simulator side) ===
+    def _send_step(self, step, counters, stop):
+        """Emit step.vehicles packets per tick at step.rate_hz until stopped."""
+        sim = self.sim
+        base_team = sim.team_id
+        team_ids = [str(int(base_team) + k) for k in range(step.vehicles)]
+        padding = ("," + "X" * (step.pad_bytes - 1)) if step.pad_bytes > 0 else ""
+        period = 1.0 / step.rate_hz
+        next_due = time.perf_counter()
+        try:
+            while not stop.is_set():
+                sim.check_commands()
+                for team_id in team_ids:
+                    sim.team_id = team_id
+                    packet = (sim.generate_telemetry() + padding + "\r\n").encode()
+                    sim.port.write(packet)
+                    counters["sent"] += 1
+                    counters["sent_bytes"] += len(packet)
+                sim.packet_count += 1
+                next_due += period
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_due = time.perf_counter()
+        finally:
+            sim.team_id = base_team
+
+    # === RECEIVER (ground-station side) ===
+    def run_step(self, step):
+        counters = {"sent": 0, "sent_bytes": 0}
+        stop = threading.Event()
+        sender = threading.Thread(target=self._send_step, args=(step, counters, stop), daemon=True)
+
+        # CMD_ECHO only holds the last command, so one probe at a time, at most
+        # one per two packet periods, and none in the step's last latency budget.
+        # An echo can only ride on the next packet, so one packet period of
+        # waiting is inherent and the latency budget applies on top of it.
+        period = 1.0 / step.rate_hz
+        latency_limit = self.max_echo_latency + period
+        probe_interval = max(self.probe_interval, 2.0 * period)
+        probe_timeout = latency_limit + period
+        probe = None         # (token, send time) of the outstanding probe
+        latencies = []
+        probe_seq = timeouts = 0
+        received = received_bytes = 0
+        pending = b""        # partial line left by a readline() timeout
+        start_totals = self.receiver.totals() if self.receiver is not None else None
+
+        def on_chunk(chunk, now):
+            # readline() returns a fragment when the port timeout expires first;
+            # only a complete line counts as a packet or can carry an echo
+            nonlocal pending
+            pending += chunk
+            if pending.endswith(b"\n"):
+                if not pending.startswith(b"TEAM_ID"):   # CSV header is not a packet
+                    on_line(pending, now)
+                pending = b""
+
+        def on_line(line, now):
+            nonlocal probe, received, received_bytes
+            received += 1
+            received_bytes += len(line)
+            if probe is not None and echo_field(line) == probe[0]:
+                latencies.append(now - probe[1])
+                probe = None
+
+        start = time.perf_counter()
+        end = start + step.duration
+        next_probe = start
+        sender.start()
+        while True:
+            now = time.perf_counter()
+            if now >= end:
+                break
+            if self.gs_port is None:
+                time.sleep(min(0.05, end - now))
+                continue
+            if probe is not None and now - probe[1] > probe_timeout:
+                timeouts += 1
+                probe = None
+            if probe is None and now >= next_probe and now < end - probe_timeout:
+                probe_seq += 1
+                probe = (f"PING{probe_seq}", now)
+                self.gs_port.write(f"CMD,{self.sim.team_id},{probe[0]}\r\n".encode())
+                next_probe = now + probe_interval
+            chunk = self.gs_port.readline()
+            if chunk:
+                on_chunk(chunk, time.perf_counter())
+        stop.set()
+        sender.join()
+        elapsed = time.perf_counter() - start
+
+        # Drain what is still in flight (echoes included) so it is not counted against the next step
+        drain_until = time.perf_counter() + self.settle
+        while time.perf_counter() < drain_until:
+            if self.gs_port is None:
+                time.sleep(0.05)
+                continue
+            chunk = self.gs_port.readline()
+            if chunk:
+                on_chunk(chunk, time.perf_counter())
+        if probe is not None and time.perf_counter() - probe[1] > probe_timeout:
+            timeouts += 1
+
+        sent = counters["sent"]
+        if self.receiver is not None:
+            end_packets, end_bytes = self.receiver.totals()
+            received = end_packets - start_totals[0]
+            if end_bytes is not None and start_totals[1] is not None:
+                received_bytes = end_bytes - start_totals[1]
+            else:
+                received_bytes = counters["sent_bytes"] * received / sent if sent else 0
+        loss = max(0.0, 1.0 - received / sent) if sent else 0.0
+
+        # Timed-out probes count as infinitely late; "higher" keeps percentiles free of NaN
+        lat = np.array(latencies + [math.inf] * timeouts)
+        if lat.size:
+            p50, p95 = (float(np.percentile(lat, q, method="higher")) for q in (50, 95))
+        else:
+            p50 = p95 = None
+
+        def ms(value):
+            return round(value * 1000, 1) if value is not None and math.isfinite(value) else None
+
+        bytes_per_s = received_bytes / elapsed
+        link_capacity = self.baudrate / 10.0 if self.baudrate else None  # 8N1: 10 bits per byte
+        return StepResult(
+            rate_hz=step.rate_hz,
+            vehicles=step.vehicles,
+            pad_bytes=step.pad_bytes,
+            sent=sent,
+            received=received,
+            loss=round(loss, 4),
+            packets_per_s=round(received / elapsed, 1),
+            bytes_per_s=round(bytes_per_s, 1),
+            link_utilization=round(bytes_per_s / link_capacity, 3) if link_capacity else None,
+            probes=probe_seq,
+            probe_timeouts=timeouts,
+            echo_p50_ms=ms(p50),
+            echo_p95_ms=ms(p95),
+            passed=bool(loss <= self.max_loss and (p95 is None or p95 <= latency_limit)),
+        )
+
+    def run(self, schedule):
+        """Run steps until one fails; returns (results, capacity report)."""
+        results = []
+        for step in schedule:
+            print(f"⏫ {step.rate_hz:g} Hz x {step.vehicles} vehicle(s), +{step.pad_bytes} B ...")
+            result = self.run_step(step)
+            results.append(result)
+            icon = "✅" if result.passed else "❌"
+            echo = (f"echo p50 {result.echo_p50_ms} ms / p95 {result.echo_p95_ms} ms"
+                    f" ({result.probe_timeouts}/{result.probes} timed out)" if result.probes else "no probes")
+            print(f"   {icon} {result.packets_per_s:g} pkt/s, loss {result.loss:.2%}, {echo}")
+            if not result.passed:
+                break
+        return results, self.capacity_report(results)
+
+    def capacity_report(self, results):
+        passed = [r for r in results if r.passed]
+        best = max(passed, key=lambda r: r.packets_per_s) if passed else None
+        return {
+            "baud_rate": self.baudrate,
+            "format": "2026 CSV",
+            "measured_by": "receiver report" if self.receiver is not None else "ground-station port",
+            "max_sustainable_packets_per_s": best.packets_per_s if best else 0.0,
+            "max_sustainable_bytes_per_s": best.bytes_per_s if best else 0.0,
+            "limit": {"max_loss": self.max_loss, "max_echo_latency_s": self.max_echo_latency},
+            "steps": [asdict(r) for r in results],
+        }
+
+
+def main(argv):
+    import argparse
+    import serial
+    from cansat_simulation_2026 import CanSatSimulator
+
+    parser = argparse.ArgumentParser(description="Ramp the telemetry rate until the ground station link saturates")
+    parser.add_argument("sim_port", help="port the simulator transmits on (e.g. COM1)")
+    parser.add_argument("gs_port", nargs="?",
+                        help="ground-station side of the virtual pair (e.g. COM2); omit with --receiver-report")
+    parser.add_argument("--receiver-report", metavar="FILE",
+                        help="cumulative 'packets[,bytes]' counter file written by the ground station")
+    parser.add_argument("--baud-rate", type=int, default=115200)
+    parser.add_argument("--rates", default="1,2,5,10,20,50,100,200,500", help="comma-separated packet rates (Hz)")
+    parser.add_argument("--vehicles", type=int, default=1)
+    parser.add_argument("--pad-bytes", type=int, default=0, help="extra trailing bytes per packet")
+    parser.add_argument("--step-seconds", type=float, default=5.0)
+    parser.add_argument("--max-loss", type=float, default=0.01)
+    parser.add_argument("--max-latency", type=float, default=1.0, help="p95 command-echo latency limit (s), on top of one packet period")
+    parser.add_argument("--physics", action="store_true")
+    parser.add_argument("--report", help="write the capacity report as JSON")
+    args = parser.parse_args(argv)
+    if not args.gs_port and not args.receiver_report:
+        parser.error("give a ground-station port or --receiver-report")
+
+    simulator = CanSatSimulator(args.sim_port, args.baud_rate, physics=args.physics)
+    simulator.process_command(f"CMD,{simulator.team_id},FLY")
+    gs_port = serial.Serial(args.gs_port, args.baud_rate, timeout=0.01) if args.gs_port else None
+    receiver = ReceiverReport(args.receiver_report) if args.receiver_report else None
+
+    schedule = build_schedule([float(r) for r in args.rates.split(",")], args.vehicles,
+                              args.pad_bytes, args.step_seconds)
+    ramp = RampTest(simulator, gs_port, args.baud_rate, args.max_loss, args.max_latency, receiver=receiver)
+    try:
+        _, report = ramp.run(schedule)
+    finally:
+        if gs_port is not None:
+            gs_port.close()
+        simulator.port.close()
+
+    print(f"\n📊 Max sustainable: {report['max_sustainable_packets_per_s']:g} packets/s "
+          f"({report['max_sustainable_bytes_per_s']:g} B/s) at {args.baud_rate} baud")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,152 @@
+"""
+Multi-rate sensor channel producers with a lock-free packet assembler.
+
+Real flight software samples sensors at their own rates (IMU fast, GPS at
+a few Hz, environmental sensors slower) and downlinks whatever is latest.
+Each ChannelProducer thread calls its sample function at its own rate and
+publishes the result into a LatestValueSlot; the PacketAssembler reads the
+latest value of every slot when a packet is built.
+
+Slots are lock-free: each has exactly one writer, and publishing replaces
+a single immutable tuple reference, which readers pick up atomically.
+Sample functions that touch shared simulator state (flight model, track)
+are serialized with an optional lock that the simulator also holds while
+it handles commands. A sample function that raises is counted and
+skipped; the channel keeps running, and its slot keeps the last good value.
+"""
+
+import threading
+import time
+
+from sim_clock import FastClock, SimClock
+
+# Default channel rates (Hz) for the 2026 simulator
+DEFAULT_RATES = {
+    "imu": 100.0,
+    "environment": 10.0,
+    "gps": 5.0,
+    "paraglider": 10.0,
+}
+
+
+class LatestValueSlot:
+    """Single-writer slot holding the most recent (seq, timestamp, value)."""
+
+    __slots__ = ("_latest",)
+
+    def __init__(self):
+        self._latest = (0, None, None)
+
+    def publish(self, value, timestamp):
+        self._latest = (self._latest[0] + 1, timestamp, value)
+
+    def latest(self):
+        return self._latest
+
+
+class ChannelProducer(threading.Thread):
+    """Thread that samples one sensor channel at a fixed rate."""
+
+    def __init__(self, name, rate_hz, sample_fn, clock, lock=None):
+        super().__init__(name=f"producer-{name}", daemon=True)
+        self.channel = name
+        self.period = 1.0 / rate_hz
+        self.sample_fn = sample_fn
+        self.clock = clock
+        self.lock = lock
+        self.slot = LatestValueSlot()
+        self.overruns = 0
+        self.errors = 0
+        self.last_error = None
+        self._stop_event = threading.Event()
+
+    def _sample(self):
+        if self.lock is None:
+            return self.sample_fn()
+        with self.lock:
+            return self.sample_fn()
+
+    def run(self):
+        next_due = self.clock.now()
+        while not self._stop_event.is_set():
+            try:
+                self.slot.publish(self._sample(), self.clock.now())
+            except Exception as e:
+                self.errors += 1
+                if self.last_error is None:
+                    print(f"❌ {self.channel} channel failed (further errors counted): {e!r}")
+                self.last_error = repr(e)
+            next_due += self.period
+            delay = next_due - self.clock.now()
+            if delay > 0:
+                self.clock.sleep(delay)
+            else:
+                # Sampling took longer than the period: skip missed ticks
+                self.overruns += 1
+                next_due = self.clock.now()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class PacketAssembler:
+    """Samples the latest value of every channel at telemetry rate."""
+
+    def __init__(self, producers, clock):
+        self.producers = producers
+        self.clock = clock
+
+    def wait_ready(self, timeout=2.0):
+        """Block until every channel has published at least once."""
+        deadline = time.monotonic() + timeout
+        while any(p.slot.latest()[0] == 0 for p in self.producers):
+            if time.monotonic() > deadline:
+                missing = [p.channel for p in self.producers if p.slot.latest()[0] == 0]
+                raise TimeoutError(f"channels never published: {', '.join(missing)}")
+            time.sleep(0.001)
+
+    def snapshot(self):
+        """Merged field dict from the latest sample of every channel."""
+        fields = {}
+        for producer in self.producers:
+            value = producer.slot.latest()[2]
+            if value is not None:
+                fields.update(value)
+        return fields
+
+    def ages(self):
+        """Seconds since each channel last published."""
+        now = self.clock.now()
+        return {p.channel: now - p.slot.latest()[1] for p in self.producers if p.slot.latest()[1] is not None}
+
+
+class SensorSuite:
+    """Owns the producer threads and the assembler for one simulator."""
+
+    def __init__(self, channels, clock=None, rates=None, lock=None):
+        """channels maps channel name -> sample function returning a field dict."""
+        clock = clock if clock is not None else SimClock()
+        if isinstance(clock, FastClock):
+            raise ValueError("sensor producers need a throttled clock (real-time or scaled)")
+        rates = {**DEFAULT_RATES, **(rates or {})}
+        self.producers = [ChannelProducer(name, rates[name], fn, clock, lock) for name, fn in channels.items()]
+        self.assembler = PacketAssembler(self.producers, clock)
+
+    def start(self):
+        for producer in self.producers:
+            producer.start()
+        self.assembler.wait_ready()
+
+    def snapshot(self):
+        return self.assembler.snapshot()
+
+    def stats(self):
+        """Per-channel overrun and error counts."""
+        return {p.channel: {"overruns": p.overruns, "errors": p.errors, "last_error": p.last_error}
+                for p in self.producers}
+
+    def stop(self):
+        for producer in self.producers:
+            producer.stop()
+        for producer in self.producers:
+            producer.join(timeout=1.0)
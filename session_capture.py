@@ -0,0 +1,207 @@
+"""
+Record-and-replay of live simulator sessions.
+
+CaptureTransport wraps the serial port used by CanSatSimulator and appends
+every TX and RX frame to a compact binary log with monotonic nanosecond
+timestamps. replay_capture() plays the TX frames of a log back against
+another port with the original timing, or N times faster.
+
+Log format (optionally gzip-compressed as a whole):
+    header : b"CSCAP1\\n"
+    record : <direction:u8><timestamp_ns:u64><length:u32><payload bytes>
+
+Every writer starts with a SESSION record whose payload is the wall-clock
+start time. Monotonic timestamps are only comparable within one session
+(an appended session may come from another process or boot), so readers
+restart their timing at each SESSION record.
+"""
+
+import gzip
+import os
+import struct
+import sys
+import threading
+import time
+
+MAGIC = b"CSCAP1\n"
+RECORD = struct.Struct("<BQI")
+TX = 0
+RX = 1
+SESSION = 2
+DIRECTION_NAMES = {TX: "TX", RX: "RX", SESSION: "SESSION"}
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+# === WRITER ===
+class CaptureWriter:
+    """Append-only binary frame log; safe to share between threads."""
+
+    def __init__(self, path, compress=False):
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file and _is_compressed(path) != compress:
+            # Mixing plain and gzip data in one file makes it unreadable
+            mode = "gzip-compressed" if not compress else "uncompressed"
+            raise ValueError(f"{path}: existing log is {mode}; refusing to append")
+        if compress:
+            # Appending adds a new gzip member; readers see one continuous stream
+            self._file = gzip.open(path, "ab", compresslevel=6)
+        else:
+            self._file = open(path, "ab", buffering=64 * 1024)
+        if new_file:
+            self._file.write(MAGIC)
+        self.frames = 0
+        self._lock = threading.Lock()
+        self.write_frame(SESSION, time.strftime("%Y-%m-%dT%H:%M:%S%z").encode())
+
+    def write_frame(self, direction, payload, timestamp_ns=None):
+        """Record one frame; timestamp defaults to time.monotonic_ns()."""
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        # One write per record, so concurrent writers never interleave inside a frame
+        record = RECORD.pack(direction, timestamp_ns, len(payload)) + payload
+        with self._lock:
+            self._file.write(record)
+            self.frames += 1
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+# === READER ===
+def _is_compressed(path):
+    with open(path, "rb") as f:
+        return f.read(2) == GZIP_MAGIC
+
+
+def _open_capture(path):
+    return gzip.open(path, "rb") if _is_compressed(path) else open(path, "rb")
+
+
+def read_capture(path):
+    """Yield (direction, timestamp_ns, payload) for every frame in a log."""
+    with _open_capture(path) as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: not a capture log (bad header)")
+        while True:
+            raw = f.read(RECORD.size)
+            if len(raw) < RECORD.size:
+                if raw:
+                    raise ValueError(f"{path}: truncated record")
+                return
+            direction, ts, length = RECORD.unpack(raw)
+            payload = f.read(length)
+            if len(payload) < length:
+                raise ValueError(f"{path}: truncated payload ({len(payload)} of {length} bytes)")
+            yield direction, ts, payload
+
+
+# === TRANSPORT WRAPPER ===
+class CaptureTransport:
+    """Serial-port wrapper that logs every frame written and read."""
+
+    def __init__(self, port, path, compress=False):
+        self.port = port
+        self.writer = CaptureWriter(path, compress)
+
+    @property
+    def in_waiting(self):
+        return self.port.in_waiting
+
+    def write(self, data):
+        self.writer.write_frame(TX, data)
+        return self.port.write(data)
+
+    def readline(self):
+        line = self.port.readline()
+        if line:
+            self.writer.write_frame(RX, line)
+        return line
+
+    def read(self, size=1):
+        data = self.port.read(size)
+        if data:
+            self.writer.write_frame(RX, data)
+        return data
+
+    def close(self):
+        self.writer.close()
+        self.port.close()
+
+
+# === REPLAYER ===
+def replay_capture(path, port, speed=1.0, directions=(TX,)):
+    """Write the selected frames of a log to `port`, preserving timing.
+
+    speed scales playback (2.0 = twice as fast); 0 replays unthrottled.
+    Each session is replayed right after the previous one, with its own
+    timing. Returns the number of frames written.
+    """
+    sent = 0
+    first_ts = None
+    start = time.perf_counter_ns()
+    for direction, ts, payload in read_capture(path):
+        if direction == SESSION:
+            first_ts = None
+            start = time.perf_counter_ns()
+            continue
+        if direction not in directions:
+            continue
+        if first_ts is None:
+            first_ts = ts
+        if speed > 0:
+            due = start + (ts - first_ts) / speed
+            delay = (due - time.perf_counter_ns()) / 1e9
+            if delay > 0:
+                time.sleep(delay)
+        port.write(payload)
+        sent += 1
+    return sent
+
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or replay simulator capture logs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    dump = sub.add_parser("dump", help="print the frames of a capture log")
+    dump.add_argument("capture")
+
+    replay = sub.add_parser("replay", help="replay captured TX frames to a serial port")
+    replay.add_argument("capture")
+    replay.add_argument("com_port")
+    replay.add_argument("--baud-rate", type=int, default=115200)
+    replay.add_argument("--speed", type=float, default=1.0, help="playback speed factor, 0 = unthrottled")
+    replay.add_argument("--include-rx", action="store_true", help="also replay received frames")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "dump":
+        first_ts = None
+        for direction, ts, payload in read_capture(args.capture):
+            if direction == SESSION:
+                first_ts = None
+                print(f"--- session started {payload.decode(errors='replace')} ---")
+                continue
+            first_ts = ts if first_ts is None else first_ts
+            print(f"{(ts - first_ts) / 1e6:12.3f} ms {DIRECTION_NAMES[direction]} {payload!r}")
+        return
+
+    import serial
+    port = serial.Serial(args.com_port, args.baud_rate, timeout=1)
+    try:
+        directions = (TX, RX) if args.include_rx else (TX,)
+        sent = replay_capture(args.capture, port, args.speed, directions)
+        print(f"✅ Replayed {sent} frames to {args.com_port}")
+    finally:
+        port.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,166 @@
+"""
+Shared-memory ring buffer transport for consumers on the same host.
+
+ShmRingTransport publishes each encoded packet into a
+multiprocessing.shared_memory ring using a lock-free single-producer
+protocol, bypassing the tty / com0com path entirely. ShmRingConsumer is
+the matching reader library for ground-station benchmarks.
+
+Layout:
+    header (64 bytes) : magic u32, slot_count u32, slot_size u32, pad u32,
+                        write_seq u64 (last published sequence number)
+    slot i            : seq u64, length u32, pad u32, payload
+
+The producer clears a slot's seq, writes the payload, stamps the slot's seq
+and only then publishes write_seq. A consumer accepts a slot only if its
+seq matches before and after copying, so a slot overwritten mid-read is
+detected and counted as dropped instead of delivered torn.
+"""
+
+import struct
+import sys
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+MAGIC = 0x43535231  # "CSR1"
+HEADER = struct.Struct("<IIII")
+HEADER_SIZE = 64
+WRITE_SEQ_OFFSET = 16
+SEQ = struct.Struct("<Q")
+SLOT_HEADER = struct.Struct("<QII")
+
+
+# === PRODUCER ===
+class ShmRingTransport:
+    """Single-producer ring that stands in for the simulator's serial port."""
+
+    def __init__(self, name, slot_count=4096, slot_size=512):
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.max_payload = slot_size - SLOT_HEADER.size
+        self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                              size=HEADER_SIZE + slot_count * slot_size)
+        self.buf = self.shm.buf
+        HEADER.pack_into(self.buf, 0, MAGIC, slot_count, slot_size, 0)
+        SEQ.pack_into(self.buf, WRITE_SEQ_OFFSET, 0)
+        self.write_seq = 0
+        # No uplink over shared memory; commands can be queued locally instead
+        self.commands = deque()
+
+    def write(self, data):
+        """Publish one packet; returns the number of bytes written."""
+        length = len(data)
+        if length > self.max_payload:
+            raise ValueError(f"packet of {length} bytes exceeds slot payload of {self.max_payload}")
+        seq = self.write_seq + 1
+        offset = HEADER_SIZE + ((seq - 1) % self.slot_count) * self.slot_size
+        buf = self.buf
+        SEQ.pack_into(buf, offset, 0)
+        payload_at = offset + SLOT_HEADER.size
+        buf[payload_at:payload_at + length] = data
+        SLOT_HEADER.pack_into(buf, offset, seq, length, 0)
+        SEQ.pack_into(buf, WRITE_SEQ_OFFSET, seq)
+        self.write_seq = seq
+        return length
+
+    def queue_command(self, line):
+        """Queue an uplink command line to be read by the simulator."""
+        self.commands.append(line.encode() if isinstance(line, str) else line)
+
+    @property
+    def in_waiting(self):
+        return len(self.commands)
+
+    def readline(self):
+        return self.commands.popleft() if self.commands else b""
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+# === CONSUMER ===
+class ShmRingConsumer:
+    """Reader for a ring published by ShmRingTransport."""
+
+    def __init__(self, name, from_start=False):
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.buf = self.shm.buf
+        magic, self.slot_count, self.slot_size, _ = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"shared memory '{name}' is not a telemetry ring")
+        self.next_seq = 1 if from_start else self._published() + 1
+        self.received = 0
+        self.dropped = 0
+
+    def _published(self):
+        return SEQ.unpack_from(self.buf, WRITE_SEQ_OFFSET)[0]
+
+    def read(self, max_packets=None):
+        """Return all packets published since the last call (oldest first)."""
+        published = self._published()
+        oldest = published - self.slot_count + 1
+        if self.next_seq < oldest:
+            # Producer lapped us: everything before `oldest` is gone
+            self.dropped += oldest - self.next_seq
+            self.next_seq = oldest
+        end = published if max_packets is None else min(published, self.next_seq + max_packets - 1)
+
+        packets = []
+        buf = self.buf
+        while self.next_seq <= end:
+            seq = self.next_seq
+            offset = HEADER_SIZE + ((seq - 1) % self.slot_count) * self.slot_size
+            slot_seq, length, _ = SLOT_HEADER.unpack_from(buf, offset)
+            payload_at = offset + SLOT_HEADER.size
+            data = bytes(buf[payload_at:payload_at + length])
+            if slot_seq == seq and SEQ.unpack_from(buf, offset)[0] == seq:
+                packets.append(data)
+            else:
+                self.dropped += 1
+            self.next_seq += 1
+        self.received += len(packets)
+        return packets
+
+    def packets(self, poll_interval=0.0005):
+        """Yield packets forever, polling the ring when it is empty."""
+        while True:
+            batch = self.read()
+            if not batch:
+                time.sleep(poll_interval)
+                continue
+            yield from batch
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+
+def main(argv):
+    """Attach to a ring and report the received packet rate."""
+    if not argv:
+        print("Usage: python shm_transport.py NAME")
+        return
+    consumer = ShmRingConsumer(argv[0])
+    print(f"📥 Attached to ring '{argv[0]}' ({consumer.slot_count} x {consumer.slot_size} B)")
+    last_report = time.monotonic()
+    last_received = 0
+    try:
+        while True:
+            if not consumer.read():
+                time.sleep(0.0005)
+            now = time.monotonic()
+            if now - last_report >= 1.0:
+                rate = (consumer.received - last_received) / (now - last_report)
+                print(f"📊 {rate:,.0f} packets/s, {consumer.received} received, {consumer.dropped} dropped")
+                last_report, last_received = now, consumer.received
+    except KeyboardInterrupt:
+        pass
+    finally:
+        consumer.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
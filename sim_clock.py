@@ -0,0 +1,67 @@
+"""
+Pluggable simulation clocks.
+
+The simulators read time and sleep only through a clock object, so the same
+flight can run in real time, scaled (e.g. 10x / 100x) or as fast as possible
+while MISSION_TIME, GPS_TIME and flight progression stay self-consistent.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+
+class SimClock:
+    """Simulated time running at `speed` times wall-clock speed."""
+
+    def __init__(self, speed=1.0, epoch=None):
+        if speed <= 0:
+            raise ValueError("speed must be positive (use FastClock for unthrottled runs)")
+        self.speed = speed
+        self.epoch = epoch if epoch is not None else datetime.now()
+        self._t0 = time.monotonic()
+
+    def now(self):
+        """Simulated seconds since the clock was created."""
+        return (time.monotonic() - self._t0) * self.speed
+
+    def sleep(self, seconds):
+        """Block for `seconds` of simulated time."""
+        if seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def datetime(self):
+        """Simulated wall-clock time."""
+        return self.epoch + timedelta(seconds=self.now())
+
+
+class FastClock(SimClock):
+    """Unthrottled clock: sleeping just advances simulated time."""
+
+    speed = float("inf")
+
+    def __init__(self, epoch=None):
+        self.epoch = epoch if epoch is not None else datetime.now()
+        self._now = 0.0
+
+    def now(self):
+        return self._now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self._now += seconds
+
+
+def make_clock(mode="realtime", epoch=None):
+    """Build a clock from a CLI-style spec: 'realtime', '10x' / '10', or 'fast'."""
+    mode = str(mode).strip().lower()
+    if mode in ("fast", "afap", "max", "0"):
+        return FastClock(epoch)
+    if mode in ("realtime", "real", "1", "1x"):
+        return SimClock(1.0, epoch)
+    return SimClock(float(mode.rstrip("x")), epoch)
+
+
+def format_elapsed(seconds):
+    """Format elapsed seconds as HH:MM:SS."""
+    elapsed = int(seconds)
+    return f"{elapsed // 3600:02d}:{(elapsed % 3600) // 60:02d}:{elapsed % 60:02d}"
@@ -0,0 +1,242 @@
+"""
+Simulation mode: fly the CanSat from a stream of barometric pressures.
+
+In simulation mode the ground station replaces the pressure sensor. After
+"CMD,<team>,SIM,ENABLE" and "CMD,<team>,SIM,ACTIVATE" it sends
+"CMD,<team>,SIMP,<pascals>" commands (normally from a pressure-profile
+file), and altitude and flight state are derived from those pressures.
+
+SimPressureFeed converts each sample to altitude as it arrives. The first
+sample after activation is taken as ground pressure, and each sample costs
+a constant amount of scalar math, so back-to-back SIMP commands never
+queue up behind a recomputation. PressureProfile reads a profile file
+through mmap, so long profiles are streamed rather than loaded.
+"""
+
+import math
+import mmap
+import sys
+
+from flight_dynamics import (STATES, LAUNCH_PAD, ASCENT, APOGEE, DESCENT, PROBE_RELEASE,
+                             PAYLOAD_RELEASE, LANDED, SEA_LEVEL_TEMP_K, LAPSE_RATE, ISA_EXPONENT)
+
+ALTITUDE_SCALE = SEA_LEVEL_TEMP_K / LAPSE_RATE   # m
+PRESSURE_POWER = 1.0 / ISA_EXPONENT
+
+
+def valid_pressure(pressure_pa):
+    """SIMP pressures must be finite and positive (Pa)."""
+    return math.isfinite(pressure_pa) and pressure_pa > 0.0
+
+
+class SimPressureFeed:
+    """ENABLE/ACTIVATE handshake plus incremental pressure -> altitude -> state."""
+
+    def __init__(self, launch_altitude=10.0, apogee_drop=5.0, descent_drop=20.0,
+                 probe_release_alt=300.0, payload_release_alt=100.0, landed_alt=5.0):
+        self.launch_altitude = launch_altitude
+        self.apogee_drop = apogee_drop
+        self.descent_drop = descent_drop
+        self.probe_release_alt = probe_release_alt
+        self.payload_release_alt = payload_release_alt
+        self.landed_alt = landed_alt
+        self.enabled = False
+        self.activated = False
+        self.samples = 0
+        self.reset()
+
+    @property
+    def active(self):
+        return self.enabled and self.activated
+
+    def reset(self):
+        self.ground_pressure = None
+        self.pressure = None      # Pa
+        self.altitude = 0.0
+        self.peak_altitude = 0.0
+        self.phase = LAUNCH_PAD
+
+    # === HANDSHAKE ===
+    def enable(self):
+        self.enabled = True
+
+    def activate(self):
+        """Returns False (and stays inactive) unless SIM ENABLE came first."""
+        if not self.enabled:
+            return False
+        if not self.activated:
+            self.activated = True
+            self.reset()
+        return True
+
+    def disable(self):
+        self.enabled = False
+        self.activated = False
+
+    # === INGESTION ===
+    def ingest(self, pressure_pa):
+        """Take one SIMP sample; returns False if inactive or the pressure is invalid."""
+        if not self.active or not valid_pressure(pressure_pa):
+            return False
+        if self.ground_pressure is None:
+            self.ground_pressure = pressure_pa
+        self.pressure = pressure_pa
+        altitude = ALTITUDE_SCALE * (1.0 - (pressure_pa / self.ground_pressure) ** PRESSURE_POWER)
+        self.altitude = altitude
+        self.samples += 1
+        self._advance(altitude)
+        return True
+
+    def _advance(self, altitude):
+        """Phases only move forward, so sensor noise cannot reopen an earlier one."""
+        phase = self.phase
+        if phase == LAUNCH_PAD:
+            if altitude > self.launch_altitude:
+                phase = ASCENT
+        elif phase == ASCENT:
+            if altitude < self.peak_altitude - self.apogee_drop:
+                phase = APOGEE
+        elif phase == APOGEE:
+            if altitude < self.peak_altitude - self.descent_drop:
+                phase = DESCENT
+        if phase == DESCENT and altitude <= self.probe_release_alt:
+            phase = PROBE_RELEASE
+        if phase == PROBE_RELEASE and altitude <= self.payload_release_alt:
+            phase = PAYLOAD_RELEASE
+        if phase == PAYLOAD_RELEASE and altitude <= self.landed_alt:
+            phase = LANDED
+        if altitude > self.peak_altitude:
+            self.peak_altitude = altitude
+        self.phase = phase
+
+    # === TELEMETRY VALUES ===
+    @property
+    def state(self):
+        return STATES[self.phase]
+
+    def pressure_kpa(self):
+        return None if self.pressure is None else self.pressure / 1000.0
+
+
+class PressureProfile:
+    """Pressure-profile file (one sample per line) read lazily through mmap.
+
+    Lines are either bare pascal values or full "CMD,<team>,SIMP,<pascals>"
+    commands; blank lines and lines starting with '#' are skipped, and
+    malformed or invalid pressures are reported and skipped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        # mmap cannot map an empty file; an empty profile simply has no samples
+        if self._file.seek(0, 2) == 0:
+            self._map = b""
+        else:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._pos = 0
+        self._line_no = 0
+        self.consumed = 0
+        self.skipped = 0
+
+    def next_pressure(self):
+        """Next sample in Pa, or None at the end of the file."""
+        data = self._map
+        while self._pos < len(data):
+            end = data.find(b"\n", self._pos)
+            if end < 0:
+                end = len(data)
+            line = data[self._pos:end].strip()
+            self._pos = end + 1
+            self._line_no += 1
+            if not line or line.startswith(b"#"):
+                continue
+            try:
+                pressure = float(line.rsplit(b",", 1)[-1])
+            except ValueError:
+                pressure = None
+            if pressure is None or not valid_pressure(pressure):
+                self.skipped += 1
+                print(f"⚠️ {self.path}:{self._line_no}: skipping invalid pressure {line[:40]!r}")
+                continue
+            self.consumed += 1
+            return pressure
+        return None
+
+    def __iter__(self):
+        while True:
+            pressure = self.next_pressure()
+            if pressure is None:
+                return
+            yield pressure
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+
+class ProfilePlayer:
+    """Feeds a PressureProfile into a SimPressureFeed at a fixed rate of simulated time."""
+
+    def __init__(self, profile, feed, clock, rate_hz=1.0):
+        self.profile = profile
+        self.feed = feed
+        self.clock = clock
+        self.period = 1.0 / rate_hz
+        self.start_time = None
+        self.exhausted = False
+
+    def poll(self):
+        """Ingest every sample that is due by now; cost is proportional to the samples due."""
+        if not self.feed.active or self.exhausted:
+            return
+        now = self.clock.now()
+        if self.start_time is None:
+            self.start_time = now
+        due = int((now - self.start_time) / self.period) + 1
+        while self.profile.consumed < due:
+            pressure = self.profile.next_pressure()
+            if pressure is None:
+                self.exhausted = True
+                print("📉 Pressure profile finished")
+                return
+            self.feed.ingest(pressure)
+
+
+def stream_profile(path, port, team_id="1064", rate_hz=1.0):
+    """Ground-station side: send a profile to a simulator as SIM + SIMP commands."""
+    import time
+
+    port.write(f"CMD,{team_id},SIM,ENABLE\r\n".encode())
+    port.write(f"CMD,{team_id},SIM,ACTIVATE\r\n".encode())
+    profile = PressureProfile(path)
+    period = 1.0 / rate_hz if rate_hz > 0 else 0.0
+    next_due = time.monotonic()
+    try:
+        for pressure in profile:
+            port.write(f"CMD,{team_id},SIMP,{pressure:g}\r\n".encode())
+            if period:
+                next_due += period
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        profile.close()
+    print(f"📤 Sent {profile.consumed} SIMP commands")
+
+
+if __name__ == "__main__":
+    import argparse
+    import serial
+
+    parser = argparse.ArgumentParser(description="Stream a pressure profile to a simulator as SIMP commands")
+    parser.add_argument("profile", help="text file with one pressure (Pa) or SIMP command per line")
+    parser.add_argument("port", help="serial port the simulator listens on (e.g. COM2)")
+    parser.add_argument("--baud-rate", type=int, default=115200)
+    parser.add_argument("--team", default="1064")
+    parser.add_argument("--rate", type=float, default=1.0, help="SIMP commands per second (0 = back-to-back)")
+    args = parser.parse_args(sys.argv[1:])
+
+    with serial.Serial(args.port, args.baud_rate, timeout=1) as ser:
+        stream_profile(args.profile, ser, args.team, args.rate)
@@ -1,8 +1,8 @@
 import csv
 import random
-import math
 from datetime import timedelta
 from constants import load_constants
+from trajectory import FlightTrack
 
 # === CONFIGURABLE ===
 MISSION_YEAR = 2026  # Ubah ke 2025 atau 2026 sesuai misi
@@ -31,7 +31,6 @@ mag_range = config.get("mag_range", None)  # None jika tidak ada magnetometer
 # === BASE COORDINATES ===
 BASE_LAT = -7.275823
 BASE_LON = 112.794301
-MAX_DISTANCE_KM = 0.5
 
 
 # === CHECKSUM FUNCTION ===
@@ -44,14 +43,10 @@ def buatcs(data_str):
     return hasil & 0xFFFF
 
 
-# === RANDOM COORDINATE GENERATOR ===
-def random_coordinates():
-    radius = MAX_DISTANCE_KM / 111.0
-    angle = random.uniform(0, 2 * math.pi)
-    offset = random.uniform(0, radius)
-    lat_offset = offset * math.cos(angle)
-    lon_offset = offset * math.sin(angle) / math.cos(math.radians(BASE_LAT))
-    return round(BASE_LAT + lat_offset, 6), round(BASE_LON + lon_offset, 6)
+# === CONTINUOUS GPS TRACK ===
+def flight_track(total_seconds):
+    # Each state lasts 10 packets: launch after LAUNCH_PAD, glide from PROBE_RELEASE
+    return FlightTrack(BASE_LAT, BASE_LON, duration=total_seconds, launch_at=10.0, guided_from=40.0)
 
 
 # === FIELDNAME SELECTOR (auto menyesuaikan format tiap tahun) ===
@@ -89,13 +84,15 @@ def generate_telemetry(year: int):
     current_time = START_TIME
     packet_count = 0
     fieldnames = get_fieldnames(year)
+    track = flight_track(PACKET_COUNT_TOTAL)
 
     for i in range(PACKET_COUNT_TOTAL):
         state = STATES[min(i // 10, len(STATES) - 1)]
         packet_count += 1
         mission_time = current_time.strftime("%H:%M:%S")
         gps_time = mission_time
-        lat, lon = random_coordinates()
+        lat, lon = track.position(min(i, (len(STATES) - 1) * 10))
+        lat, lon = round(lat, 6), round(lon, 6)
 
         # --- Base row ---
         row = {
@@ -135,7 +132,9 @@ def generate_telemetry(year: int):
         # --- GPS dan lainnya ---
         row.update({
             "GPS_TIME": gps_time,
-            "GPS_ALTITUDE": round(random.uniform(*gps_altitude_range), 2),
+            # GPS altitude follows the barometric altitude with a little GPS error
+            "GPS_ALTITUDE": round(min(max(row["ALTITUDE"] + random.uniform(-10.0, 10.0),
+                                          gps_altitude_range[0]), gps_altitude_range[1]), 2),
             "GPS_LATITUDE": lat,
             "GPS_LONGITUDE": lon,
             "GPS_SATS": random.randint(*gps_sats_range),
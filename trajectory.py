@@ -0,0 +1,128 @@
+"""
+Continuous GPS track generation for simulated flights.
+
+FlightTrack precomputes a whole flight as east/north and lat/lon arrays:
+wind drift (a smoothly varying wind vector) from launch through ascent and
+the parachute descent, then a paraglider guided towards a target with a
+limited turn rate, loitering once it arrives. Tracks are sampled by interpolation at
+any rate, and retarget() re-plans the guided part mid-flight for the
+SET_TARGET command.
+"""
+
+import math
+
+import numpy as np
+
+METERS_PER_DEG_LAT = 111320.0
+
+
+class FlightTrack:
+    """Precomputed, continuous lat/lon track for one flight."""
+
+    def __init__(self, base_lat, base_lon, duration=100.0, dt=0.1, target=None,
+                 launch_at=0.0, guided_from=40.0, wind_speed=4.0, wind_dir_deg=None, airspeed=8.0,
+                 max_turn_rate=20.0, loiter_radius=30.0, seed=None):
+        self.base_lat = base_lat
+        self.base_lon = base_lon
+        self.m_per_deg_lon = METERS_PER_DEG_LAT * math.cos(math.radians(base_lat))
+        self.dt = dt
+        self.guided_from = guided_from
+        self.airspeed = airspeed
+        self.max_turn = math.radians(max_turn_rate) * dt
+        self.loiter_radius = loiter_radius
+        rng = np.random.default_rng(seed)
+
+        # Wind: mean vector plus an Ornstein-Uhlenbeck gust term (m/s, east/north)
+        n = int(round(duration / dt)) + 1
+        self.t = np.arange(n) * dt
+        direction = rng.uniform(0, 2 * math.pi) if wind_dir_deg is None else math.radians(wind_dir_deg)
+        mean = wind_speed * np.array([math.sin(direction), math.cos(direction)])
+        theta, sigma = 0.05, 0.8
+        decay = math.exp(-theta * dt)
+        shocks = rng.standard_normal((n, 2)) * sigma * math.sqrt(1.0 - decay * decay)
+        gust = np.zeros((n, 2))
+        for k in range(1, n):
+            gust[k] = gust[k - 1] * decay + shocks[k]
+        self.wind = mean + gust
+        self.launch_index = int(round(launch_at / dt))
+
+        self.east = np.zeros(n)
+        self.north = np.zeros(n)
+        self.heading = np.zeros(n)    # radians from north
+        self.target = (0.0, 0.0) if target is None else self._to_local(*target)
+        self._integrate(0)
+
+    # === COORDINATES ===
+    def _to_local(self, lat, lon):
+        return (lon - self.base_lon) * self.m_per_deg_lon, (lat - self.base_lat) * METERS_PER_DEG_LAT
+
+    @property
+    def lat(self):
+        return self.base_lat + self.north / METERS_PER_DEG_LAT
+
+    @property
+    def lon(self):
+        return self.base_lon + self.east / self.m_per_deg_lon
+
+    # === INTEGRATION ===
+    def _integrate(self, start):
+        """(Re)compute the track from index `start` onwards."""
+        dt = self.dt
+        guided_index = int(round(self.guided_from / dt))
+
+        # Drifting with the wind: one cumulative sum
+        drift_end = max(start, min(guided_index, len(self.t)))
+        if drift_end > start:
+            steps = self.wind[start:drift_end - 1] * dt
+            steps[:max(self.launch_index - start, 0)] = 0.0  # still on the pad
+            self.east[start + 1:drift_end] = self.east[start] + np.cumsum(steps[:, 0])
+            self.north[start + 1:drift_end] = self.north[start] + np.cumsum(steps[:, 1])
+            w = self.wind[start:drift_end]
+            self.heading[start:drift_end] = np.arctan2(w[:, 0], w[:, 1])
+
+        # Guided: heading turns towards the target at a limited rate
+        k0 = max(drift_end - 1, start, 0)
+        heading = self.heading[k0]
+        tx, ty = self.target
+        for k in range(k0, len(self.t) - 1):
+            dx, dy = tx - self.east[k], ty - self.north[k]
+            if math.hypot(dx, dy) > self.loiter_radius:
+                desired = math.atan2(dx, dy)
+            else:
+                desired = heading + self.max_turn  # circle over the target
+            error = (desired - heading + math.pi) % (2 * math.pi) - math.pi
+            heading += max(-self.max_turn, min(self.max_turn, error))
+            vx = self.wind[k, 0] + self.airspeed * math.sin(heading)
+            vy = self.wind[k, 1] + self.airspeed * math.cos(heading)
+            self.heading[k] = heading
+            self.east[k + 1] = self.east[k] + vx * dt
+            self.north[k + 1] = self.north[k] + vy * dt
+        self.heading[-1] = heading
+
+    def retarget(self, lat, lon, from_time=0.0):
+        """Point the paraglider at a new target, re-planning from `from_time`."""
+        self.target = self._to_local(lat, lon)
+        self._integrate(min(int(from_time / self.dt), len(self.t) - 1))
+
+    # === SAMPLING ===
+    def position(self, t):
+        """(lat, lon) at flight time t, interpolated."""
+        t = min(max(t, 0.0), self.t[-1])
+        east = np.interp(t, self.t, self.east)
+        north = np.interp(t, self.t, self.north)
+        return (self.base_lat + north / METERS_PER_DEG_LAT,
+                self.base_lon + east / self.m_per_deg_lon)
+
+    def guidance(self, t):
+        """(heading_error_deg, distance_to_target_m) at flight time t."""
+        k = min(max(int(round(t / self.dt)), 0), len(self.t) - 1)
+        dx, dy = self.target[0] - self.east[k], self.target[1] - self.north[k]
+        error = (math.atan2(dx, dy) - self.heading[k] + math.pi) % (2 * math.pi) - math.pi
+        return math.degrees(error), math.hypot(dx, dy)
+
+    def resample(self, rate_hz):
+        """(t, lat, lon) arrays sampled at rate_hz for the whole flight."""
+        t = np.arange(0.0, self.t[-1] + 1e-9, 1.0 / rate_hz)
+        east = np.interp(t, self.t, self.east)
+        north = np.interp(t, self.t, self.north)
+        return t, self.base_lat + north / METERS_PER_DEG_LAT, self.base_lon + east / self.m_per_deg_lon
@@ -0,0 +1,151 @@
+"""
+Backpressure-aware transmit queue between packet generation and the port.
+
+QueuedTransport puts a bounded queue in front of a serial-like port and
+drains it from a writer thread, so a stalled consumer or virtual port can
+no longer freeze the simulator. What happens when the queue is full is
+decided by the overflow policy, and every outcome is counted:
+
+    block        wait for room (optionally up to block_timeout, then drop)
+    drop_oldest  discard the oldest queued packet to make room
+    drop_newest  discard the packet being written
+    degrade      raise rate_factor so the simulator slows its packet rate,
+                 dropping the oldest packet if the queue still fills up
+
+The wrapped port is not assumed to be thread-safe (CaptureTransport and
+TelemetryBridge are not), so every call into it, from the writer thread or
+the caller's readline()/in_waiting, is made under port_lock.
+"""
+
+import threading
+import time
+from collections import deque
+
+POLICIES = ("block", "drop_oldest", "drop_newest", "degrade")
+
+
+class QueuedTransport:
+    """Serial-port wrapper with a bounded TX queue and overflow policy."""
+
+    def __init__(self, port, maxsize=256, policy="block", block_timeout=None, max_rate_factor=16.0):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown overflow policy '{policy}' (choose from {', '.join(POLICIES)})")
+        self.port = port
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.max_rate_factor = max_rate_factor
+        self.rate_factor = 1.0
+
+        self.queue = deque()
+        self.cond = threading.Condition()
+        self.port_lock = threading.Lock()
+        self.counters = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped_oldest": 0,
+            "dropped_newest": 0,
+            "blocked": 0,
+            "block_timeouts": 0,
+            "degraded": 0,
+            "recovered": 0,
+            "write_errors": 0,
+        }
+        self.block_seconds = 0.0
+        self.max_depth = 0
+        self._closed = False
+        self.writer = threading.Thread(target=self._drain, name="tx-writer", daemon=True)
+        self.writer.start()
+
+    # === PRODUCER SIDE ===
+    def write(self, data):
+        """Queue a packet; never raises because the port is slow or failing."""
+        with self.cond:
+            if len(self.queue) >= self.maxsize:
+                if not self._make_room():
+                    return 0
+            self.queue.append(data)
+            self.counters["enqueued"] += 1
+            self.max_depth = max(self.max_depth, len(self.queue))
+            if self.policy == "degrade":
+                self._adjust_rate()
+            self.cond.notify_all()
+        return len(data)
+
+    def _make_room(self):
+        """Apply the overflow policy; returns False if the new packet is dropped."""
+        if self.policy == "drop_newest":
+            self.counters["dropped_newest"] += 1
+            return False
+        if self.policy == "block":
+            self.counters["blocked"] += 1
+            start = time.monotonic()
+            has_room = self.cond.wait_for(lambda: len(self.queue) < self.maxsize or self._closed,
+                                          self.block_timeout)
+            self.block_seconds += time.monotonic() - start
+            if not has_room:
+                self.counters["block_timeouts"] += 1
+                self.counters["dropped_newest"] += 1
+                return False
+            return not self._closed
+        # drop_oldest, and degrade once slowing down was not enough
+        self.queue.popleft()
+        self.counters["dropped_oldest"] += 1
+        return True
+
+    def _adjust_rate(self):
+        """Degrade policy: double the interval above 3/4 full, recover below 1/4."""
+        depth = len(self.queue)
+        if depth >= self.maxsize * 3 // 4 and self.rate_factor < self.max_rate_factor:
+            self.rate_factor = min(self.rate_factor * 2.0, self.max_rate_factor)
+            self.counters["degraded"] += 1
+        elif depth <= self.maxsize // 4 and self.rate_factor > 1.0:
+            self.rate_factor = max(self.rate_factor / 2.0, 1.0)
+            self.counters["recovered"] += 1
+
+    # === WRITER THREAD ===
+    def _drain(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.queue or self._closed)
+                if self._closed:
+                    # Anything still queued after the flush timeout is abandoned
+                    return
+                data = self.queue.popleft()
+                self.cond.notify_all()
+            try:
+                with self.port_lock:
+                    self.port.write(data)
+                self.counters["written"] += 1
+            except Exception as e:
+                self.counters["write_errors"] += 1
+                print(f"Error transmitting: {e}")
+
+    # === SERIAL-PORT INTERFACE ===
+    @property
+    def in_waiting(self):
+        with self.port_lock:
+            return self.port.in_waiting
+
+    def readline(self):
+        with self.port_lock:
+            return self.port.readline()
+
+    def depth(self):
+        return len(self.queue)
+
+    def stats(self):
+        """Counter snapshot including queue depth and time spent blocked."""
+        return {**self.counters, "depth": len(self.queue), "max_depth": self.max_depth,
+                "block_seconds": round(self.block_seconds, 3), "rate_factor": self.rate_factor}
+
+    def close(self, flush_timeout=2.0):
+        """Flush what the port accepts within flush_timeout, then close it."""
+        with self.cond:
+            self.cond.wait_for(lambda: not self.queue, flush_timeout)
+            self._closed = True
+            self.cond.notify_all()
+        self.writer.join(timeout=flush_timeout)
+        print(f"📊 TX queue: {self.stats()}")
+        with self.port_lock:
+            self.port.close()
@@ -0,0 +1,255 @@
+"""
+Command-uplink load generator and CMD_ECHO verifier.
+
+Sends scripted or randomized "CMD,<team>,..." commands (CX, FLY, CAL, SIM,
+ST, SET_TARGET) to a running simulator at a configurable rate and watches
+the returned telemetry for the matching CMD_ECHO. Every command ends up
+in exactly one bucket:
+
+    verified     its echo appeared; latency = send -> first packet with it
+    overwritten  a later command's echo appeared first (the simulator only
+                 echoes the last command it processed before a packet)
+    missing      nothing within the timeout
+
+With --window 1 (the default) only one command is in flight at a time, so
+every echo is unambiguous. Larger windows push process_command harder at
+the cost of overwritten echoes. The random mix never sends the same
+expected echo twice in a row, so an echo left over from the previous
+command is never mistaken for a new one.
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from ramp_test import CMD_ECHO_FIELD
+
+# Weighted default mix; CX,OFF and SIM,ACTIVATE are left out because they
+# stop telemetry or switch the simulator into simulation mode
+DEFAULT_MIX = {
+    "CX,ON": 1,
+    "FLY": 1,
+    "CAL": 2,
+    "SIM,ENABLE": 1,
+    "SIM,DISABLE": 1,
+    "ST,GPS": 1,
+    "ST,{time}": 2,
+    "SET_TARGET,{lat},{lon}": 2,
+}
+BASE_LAT = -7.275764
+BASE_LON = 112.794317
+
+
+# === COMMAND SOURCES ===
+def expected_echo(tail, echo_style="2026"):
+    """CMD_ECHO the simulator reports for a command tail such as "CX,ON"."""
+    parts = [p.strip() for p in tail.split(",")]
+    command = parts[0].upper()
+    arg = parts[1].upper() if len(parts) > 1 else ""
+    if command == "CX":
+        return f"CX{arg}"
+    if command == "SIMP":
+        return f"SIMP{parts[1]}"
+    if echo_style == "legacy":
+        # cansat_simulation.py echoes every field after the team ID, joined
+        return "".join(parts)
+    if command == "SIM":
+        return f"SIM{arg}"
+    if command == "SET_TARGET":
+        return "SETTARGET"
+    return command
+
+
+def random_commands(mix=None, echo_style="2026", seed=None):
+    """Endless weighted-random command tails with no echo repeated back-to-back."""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    templates, weights = list(mix), list(mix.values())
+    last_echo = None
+    while True:
+        tail = rng.choices(templates, weights)[0].format(
+            time=f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}",
+            lat=f"{BASE_LAT + rng.uniform(-0.01, 0.01):.6f}",
+            lon=f"{BASE_LON + rng.uniform(-0.01, 0.01):.6f}",
+        )
+        echo = expected_echo(tail, echo_style)
+        if echo != last_echo:
+            last_echo = echo
+            yield tail
+
+
+def script_commands(path, loop=True):
+    """Command tails from a script file, one per line ("CX,ON" or full "CMD,<team>,CX,ON")."""
+    with open(path) as f:
+        tails = []
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split(",")
+            tails.append(",".join(parts[2:]) if parts[0].upper() == "CMD" else line)
+    if not tails:
+        raise ValueError(f"{path}: no commands")
+    while True:
+        yield from tails
+        if not loop:
+            return
+
+
+# === GENERATOR ===
+class UplinkLoadGenerator:
+    """Paced command sender that matches CMD_ECHO in the telemetry coming back."""
+
+    def __init__(self, port, commands, team_id="1064", rate_hz=5.0, window=1, timeout=3.0,
+                 echo_style="2026"):
+        self.port = port
+        self.commands = commands
+        self.team_id = team_id
+        self.period = 1.0 / rate_hz if rate_hz > 0 else 0.0
+        self.window = window
+        self.timeout = timeout
+        self.echo_style = echo_style
+        self.outstanding = []    # [(send_time, tail, expected_echo)] in send order
+        self.latencies = []
+        self.counts = {"sent": 0, "verified": 0, "overwritten": 0, "missing": 0, "packets": 0}
+        self.per_command = {}
+        self._pending = b""      # partial line left by a readline() timeout
+
+    def _send(self, now):
+        tail = next(self.commands)
+        self.port.write(f"CMD,{self.team_id},{tail}\r\n".encode())
+        self.outstanding.append((now, tail, expected_echo(tail, self.echo_style)))
+        self.counts["sent"] += 1
+
+    def _on_chunk(self, chunk, now):
+        """Buffer readline() fragments; only complete lines are packets."""
+        self._pending += chunk
+        if self._pending.endswith(b"\n"):
+            line, self._pending = self._pending, b""
+            if not line.startswith(b"TEAM_ID"):   # CSV header
+                self._on_packet(line, now)
+
+    def _on_packet(self, line, now):
+        self.counts["packets"] += 1
+        fields = line.split(b",", CMD_ECHO_FIELD + 1)
+        if len(fields) <= CMD_ECHO_FIELD:
+            return
+        echo = fields[CMD_ECHO_FIELD].decode(errors="replace")
+        for i, (sent_at, tail, expected) in enumerate(self.outstanding):
+            if expected == echo:
+                # Everything older was processed but echoed over before a packet went out
+                self.counts["overwritten"] += i
+                self.counts["verified"] += 1
+                self.latencies.append(now - sent_at)
+                name = tail.split(",", 1)[0].upper()
+                self.per_command.setdefault(name, []).append(now - sent_at)
+                del self.outstanding[:i + 1]
+                return
+
+    def _expire(self, now):
+        while self.outstanding and now - self.outstanding[0][0] > self.timeout:
+            self.outstanding.pop(0)
+            self.counts["missing"] += 1
+
+    def run(self, duration=None, count=None):
+        """Send until `duration` seconds pass or `count` commands are sent, then wait for the last echoes."""
+        start = time.perf_counter()
+        next_due = start
+        sending = True
+        try:
+            while sending or self.outstanding:
+                now = time.perf_counter()
+                if sending and ((duration is not None and now - start >= duration) or
+                                (count is not None and self.counts["sent"] >= count)):
+                    sending = False
+                if sending and now >= next_due and len(self.outstanding) < self.window:
+                    try:
+                        self._send(now)
+                    except StopIteration:
+                        sending = False
+                    next_due = max(next_due + self.period, now) if self.period else now
+                chunk = self.port.readline()
+                if chunk:
+                    self._on_chunk(chunk, time.perf_counter())
+                self._expire(time.perf_counter())
+        except KeyboardInterrupt:
+            pass
+        return self.report(time.perf_counter() - start)
+
+    def report(self, elapsed):
+        lat = np.array(self.latencies) * 1000.0
+
+        def percentiles(values):
+            if values.size == 0:
+                return {}
+            p50, p90, p99 = np.percentile(values, [50, 90, 99])
+            return {"p50_ms": round(float(p50), 1), "p90_ms": round(float(p90), 1),
+                    "p99_ms": round(float(p99), 1), "max_ms": round(float(values.max()), 1)}
+
+        return {
+            **self.counts,
+            "commands_per_s": round(self.counts["sent"] / elapsed, 2) if elapsed else 0.0,
+            "latency": percentiles(lat),
+            "per_command": {name: {"verified": len(v), **percentiles(np.array(v) * 1000.0)}
+                            for name, v in sorted(self.per_command.items())},
+        }
+
+
+def print_report(report):
+    print(f"\n📤 Sent {report['sent']} commands ({report['commands_per_s']} cmd/s), "
+          f"{report['packets']} telemetry packets received")
+    print(f"✅ Verified {report['verified']} | 🔁 Overwritten {report['overwritten']} | "
+          f"❌ Missing {report['missing']}")
+    if report["latency"]:
+        lat = report["latency"]
+        print(f"⏱️  Command->echo latency: p50 {lat['p50_ms']} ms | p90 {lat['p90_ms']} ms | "
+              f"p99 {lat['p99_ms']} ms | max {lat['max_ms']} ms")
+    for name, stats in report["per_command"].items():
+        print(f"   {name:<11} {stats['verified']:>6} verified, p50 {stats.get('p50_ms', '-')} ms, "
+              f"p99 {stats.get('p99_ms', '-')} ms")
+
+
+def main(argv):
+    import argparse
+    import json
+    import serial
+
+    parser = argparse.ArgumentParser(description="Uplink command load generator with CMD_ECHO verification")
+    parser.add_argument("com_port", help="ground-station side of the simulator's port (e.g. COM2)")
+    parser.add_argument("--baud-rate", type=int, default=115200)
+    parser.add_argument("--team", default="1064")
+    parser.add_argument("--rate", type=float, default=5.0, help="commands per second (0 = as fast as the window allows)")
+    parser.add_argument("--window", type=int, default=1, help="max commands awaiting their echo")
+    parser.add_argument("--timeout", type=float, default=3.0, help="seconds before a command counts as missing")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--count", type=int, help="stop after N commands")
+    parser.add_argument("--script", help="command file to replay in a loop instead of random commands")
+    parser.add_argument("--echo-style", choices=("2026", "legacy"), default="2026",
+                        help="2026 = cansat_simulation_2026.py, legacy = cansat_simulation.py")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    commands = (script_commands(args.script) if args.script
+                else random_commands(echo_style=args.echo_style, seed=args.seed))
+    port = serial.Serial(args.com_port, args.baud_rate, timeout=0.01)
+    try:
+        # Telemetry must be flowing for echoes to come back
+        port.write(f"CMD,{args.team},CX,ON\r\n".encode())
+        generator = UplinkLoadGenerator(port, commands, args.team, args.rate, args.window,
+                                        args.timeout, args.echo_style)
+        report = generator.run(args.duration, args.count)
+    finally:
+        port.close()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])